@@ -0,0 +1,64 @@
+"""Add partial indexes for live item listings
+
+Revision ID: 5b1e0c7d9a41
+Revises: af72bf623adb
+Create Date: 2026-10-17 10:12:03.214511
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e0c7d9a41'
+down_revision: Union[str, None] = 'af72bf623adb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (equality filters..., sort column, id), all restricted to live rows.
+# Mirrors app.models.item.LIVE_ITEM_INDEXES at the time of this revision.
+LIVE_ITEM_INDEXES = {
+    'ix_items_live_created_at': ['created_at', 'id'],
+    'ix_items_live_name': ['name', 'id'],
+    'ix_items_live_category': ['category', 'id'],
+    'ix_items_live_category_created_at': ['category', 'created_at', 'id'],
+    'ix_items_live_category_name': ['category', 'name', 'id'],
+    'ix_items_live_status_created_at': ['status', 'created_at', 'id'],
+    'ix_items_live_status_name': ['status', 'name', 'id'],
+    'ix_items_live_status_category': ['status', 'category', 'id'],
+    'ix_items_live_category_status_created_at': ['category', 'status', 'created_at', 'id'],
+    'ix_items_live_category_status_name': ['category', 'status', 'name', 'id'],
+    'ix_items_live_category_status': ['category', 'status', 'id'],
+}
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps the table writable while the indexes build,
+    # but it cannot run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        for name, columns in LIVE_ITEM_INDEXES.items():
+            op.create_index(
+                name,
+                'items',
+                columns,
+                unique=False,
+                postgresql_where=sa.text('deleted_at IS NULL'),
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        # Every query filtering on category is live-only and served by
+        # ix_items_live_category and friends; the full index is only write cost
+        op.drop_index('ix_items_category', table_name='items', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_items_category', 'items', ['category'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        for name in LIVE_ITEM_INDEXES:
+            op.drop_index(name, table_name='items', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,35 @@
+"""Add item_category_counts table
+
+Revision ID: 9d3f4a2b6c18
+Revises: 5b1e0c7d9a41
+Create Date: 2026-10-17 11:40:27.551903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3f4a2b6c18'
+down_revision: Union[str, None] = '5b1e0c7d9a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('item_category_counts',
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('count', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+    sa.PrimaryKeyConstraint('category')
+    )
+    # Backfill from the current live items
+    op.execute(
+        "INSERT INTO item_category_counts (category, count) "
+        "SELECT category, count(*) FROM items WHERE deleted_at IS NULL GROUP BY category"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('item_category_counts')
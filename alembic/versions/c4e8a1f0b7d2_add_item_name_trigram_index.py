@@ -0,0 +1,42 @@
+"""Add trigram index for item name search
+
+Revision ID: c4e8a1f0b7d2
+Revises: 9d3f4a2b6c18
+Create Date: 2026-10-17 14:05:44.120377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1f0b7d2'
+down_revision: Union[str, None] = '9d3f4a2b6c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # CONCURRENTLY keeps the table writable while the index builds,
+    # but it cannot run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_items_live_name_trgm',
+            'items',
+            ['name'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+            postgresql_where=sa.text('deleted_at IS NULL'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_items_live_name_trgm', table_name='items', postgresql_concurrently=True, if_exists=True)
+    # The extension is left installed; other objects may depend on it by now
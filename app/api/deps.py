@@ -1,15 +1,17 @@
+import secrets
 from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from jose import JWTError
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core import security
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.redis import redis_client
+from app.core.revocation import revocation_list
 from app.models.user import User
-from app.schemas.auth import TokenPayload
-from sqlalchemy import select
+from app.services.user_cache import user_cache
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"/api/v1/users/login"
@@ -20,30 +22,43 @@ async def get_current_user(
     token: str = Depends(reusable_oauth2)
 ) -> User:
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
+        token_data = security.decode_token(token)
     except (JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
 
-    # Check validation against Redis Blacklist
-    from app.core.redis import redis_client
-    is_blacklisted = await redis_client.get_value(f"blacklist:{token}")
-    if is_blacklisted:
+    # Check revocation: by jti against the in-process revocation list,
+    # or against the Redis blacklist for tokens issued before jti existed
+    if token_data.jti:
+        is_revoked = revocation_list.is_revoked(token_data.jti)
+    else:
+        is_revoked = await redis_client.get_value(f"blacklist:{token}")
+    if is_revoked:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token has been revoked",
         )
     
-    result = await db.execute(select(User).where(User.id == token_data.sub))
-    user = result.scalars().first()
-    
+    user = await user_cache.get(db, token_data.sub)
+
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return user
+
+async def verify_internal_token(
+    x_internal_token: Optional[str] = Header(None),
+) -> None:
+    # Not configured: the operational endpoints do not exist
+    if not settings.INTERNAL_API_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if x_internal_token is None or not secrets.compare_digest(
+        x_internal_token.encode(), settings.INTERNAL_API_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid internal token",
+        )
@@ -0,0 +1,30 @@
+from typing import Any
+from fastapi import APIRouter, Depends
+
+from app.api import deps
+from app.core.database import engine, read_engines
+from app.core.pool import pool_status
+from app.services.item_service import item_cache
+from app.services.user_cache import user_cache
+
+# Operational endpoints, mounted outside /api/v1 and hidden from the OpenAPI schema.
+# Only reachable with the INTERNAL_API_TOKEN in the X-Internal-Token header.
+router = APIRouter(dependencies=[Depends(deps.verify_internal_token)])
+
+@router.get("/cache-stats")
+async def cache_stats() -> Any:
+    """
+    Hit/miss counters of this worker's caches (the item cache itself lives in
+    Redis, but its counters are per worker).
+    """
+    return {"user_cache": user_cache.stats(), "item_cache": item_cache.stats()}
+
+@router.get("/db-pool")
+async def db_pool() -> Any:
+    """
+    Live connection pool statistics of this worker, per engine.
+    """
+    return {
+        "primary": pool_status(engine),
+        "replicas": [pool_status(read_engine) for read_engine in read_engines],
+    }
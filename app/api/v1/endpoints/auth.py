@@ -1,3 +1,4 @@
+import time
 from typing import Any
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -8,38 +9,44 @@ from sqlalchemy import select
 from app.api import deps
 from app.core import security
 from app.core.database import get_db
+from app.core.rate_limit import RateLimit
 from app.models.user import User
 from app.services.user_service import UserService
 from app.schemas.user import UserCreate, UserResponse
-from app.schemas.auth import Token, RefreshTokenRequest, TokenPayload
+from app.schemas.auth import Token, RefreshTokenRequest
 from app.core.config import settings
-from jose import jwt, JWTError
+from jose import JWTError
 from pydantic import ValidationError
 from app.core.redis import redis_client
+from app.core.revocation import revocation_list
 
 router = APIRouter()
 
+# Per client address: both run bcrypt, so they are the cheapest way to tie up a worker
+login_rate_limit = RateLimit("login", settings.RATE_LIMIT_LOGIN_PER_MINUTE)
+register_rate_limit = RateLimit("register", settings.RATE_LIMIT_REGISTER_PER_MINUTE)
+
 @router.post("/logout", status_code=200)
 async def logout(
     token: str = Depends(deps.reusable_oauth2)
 ):
     """
-    Logout user by blacklisting the access token.
+    Logout user by revoking the access token.
     """
-    # Simply add the token to redis blacklist
-    # We ideally should calculate remaining time from token exp, but for simplicity we use static expire
-    # In a real scenario: decode token -> gets 'exp' -> calc ttl
-    
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
-        # Optionally Calculate TTL here
-        # exp = payload.get("exp")
-        # now = datetime.utcnow().timestamp()
-        # ttl = int(exp - now)
-    except:
-        pass # If token invalid, still OK to just return success or ignore
-        
-    await redis_client.set_value(f"blacklist:{token}", "true", expire=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+        token_data = security.decode_token(token)
+    except (JWTError, ValidationError):
+        # An invalid token cannot be used anyway, nothing to revoke
+        return {"message": "Successfully logged out"}
+
+    if token_data.jti and token_data.exp:
+        # Remembered only until the token would have expired by itself
+        await revocation_list.revoke(token_data.jti, token_data.exp)
+    else:
+        ttl = int(token_data.exp - time.time()) if token_data.exp else 0
+        await redis_client.set_value(
+            f"blacklist:{token}", "true", expire=ttl if ttl > 0 else settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        )
     return {"message": "Successfully logged out"}
 
 @router.post("/refresh", response_model=Token)
@@ -51,10 +58,7 @@ async def refresh_token(
     Refresh access token using a refresh token
     """
     try:
-        payload = jwt.decode(
-            refresh_in.refresh_token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
+        token_data = security.decode_token(refresh_in.refresh_token)
     except (JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -62,7 +66,7 @@ async def refresh_token(
         )
         
     # Verify it's a refresh token
-    if payload.get("type") != "refresh":
+    if token_data.type != "refresh":
          raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid token type",
@@ -84,7 +88,7 @@ async def refresh_token(
         "token_type": "bearer",
     }
 
-@router.post("/login", response_model=Token)
+@router.post("/login", response_model=Token, dependencies=[Depends(login_rate_limit)])
 async def login_access_token(
     db: AsyncSession = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
@@ -111,7 +115,9 @@ async def login_access_token(
         "token_type": "bearer",
     }
 
-@router.post("/register", response_model=UserResponse, status_code=201)
+@router.post(
+    "/register", response_model=UserResponse, status_code=201, dependencies=[Depends(register_rate_limit)]
+)
 async def register_new_user(
     *,
     db: AsyncSession = Depends(get_db),
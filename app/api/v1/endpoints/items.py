@@ -1,43 +1,174 @@
-from typing import Any, List, Optional
+import csv
+import hashlib
+from typing import Any, Dict, List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import deps
-from app.core.database import get_db
-from app.schemas.item import ItemCreate, ItemResponse, ItemUpdate, PaginatedItemResponse
+from app.core.config import settings
+from app.core.database import get_db, get_read_db, get_read_session_factory, records_writes
+from app.core.pagination import InvalidCursorError
+from app.core.rate_limit import RateLimit
+from app.repositories.item_repository import BulkSelectionTooLargeError
+from app.schemas.item import (
+    ITEM_FIELDS,
+    ItemBulkCreate,
+    ItemBulkCreateResponse,
+    ItemBulkDelete,
+    ItemBulkResult,
+    ItemBulkUpdate,
+    ItemCreate,
+    ItemImportReport,
+    ItemResponse,
+    ItemUpdate,
+    PaginatedItemResponse,
+)
 from app.services.item_service import ItemService
 from app.models.user import User
 
-router = APIRouter()
+# Per user (per address for unauthenticated calls), across all item routes
+rate_limit = RateLimit("items", settings.RATE_LIMIT_ITEMS_PER_MINUTE)
+
+router = APIRouter(dependencies=[Depends(rate_limit), Depends(records_writes)])
+
+# Clients may keep responses but must revalidate them (If-None-Match) before reuse
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+def _make_etag(*parts: Any) -> str:
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # If-None-Match uses weak comparison, so a W/ prefix does not matter
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+def _not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL},
+    )
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    `fields=id,name` -> the requested item fields in their canonical order,
+    or None (all fields) when not given.
+    """
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(ITEM_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [name for name in ITEM_FIELDS if name in requested] or None
+
+def _json_response(content: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Serializes JSON-ready content straight to bytes, skipping the
+    response_model validation FastAPI would run again. Only for content built
+    by the service's read paths, which already has the declared shape.
+    """
+    return Response(content=to_json(content), media_type="application/json", headers=headers)
 
 @router.get("/analytics/category-density")
 async def get_analytics(
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     # current_user: User = Depends(deps.get_current_user) # Opsiyonel: Analitik herkese açık mı olsun? Genelde protected olur.
 ) -> Any:
     """
     Get category density analytics.
     """
+    response.headers["Cache-Control"] = f"public, max-age={settings.ANALYTICS_CACHE_SOFT_TTL_SECONDS}"
     return await ItemService.get_analytics(db)
 
 @router.get("/", response_model=PaginatedItemResponse)
 async def read_items(
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=100),
     category: Optional[str] = None,
     item_status: Optional[str] = Query(None, alias="status"),
     sort_by: str = Query("created_at", regex="^(created_at|name|category)$"),
     order: str = Query("desc", regex="^(asc|desc)$"),
+    cursor: Optional[str] = None,
+    count: Optional[str] = Query(None, regex="^(exact|estimated|cached|none)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated item fields to return, e.g. id,name"),
+    q: Optional[str] = Query(None, min_length=1, max_length=200, description="Search item names"),
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
     """
     Retrieve items.
+
+    Pass `next_cursor`/`prev_cursor` from a previous response as `cursor` to walk
+    the list by keyset instead of `page`. `count` trades the precision of
+    `total`/`pages` for speed; the response echoes the mode used in `count_mode`.
+    It defaults to `exact` for pages and to `none` for cursor requests, which
+    would otherwise pay for a full count on every step of the walk.
+    With `fields`, items hold only the listed fields. `q` searches names
+    (substring or fuzzy word match) and ranks the results by relevance instead
+    of `sort_by`; it can be combined with the filters but not with `cursor`.
     """
-    result = await ItemService.get_multi(
-        db, page=page, limit=per_page, category=category, status=item_status, sort_by=sort_by, order=order
+    selected = _parse_fields(fields)
+    if count is None:
+        count = "none" if cursor else "exact"
+
+    # The ETag is derived from the collection version (changed by every item
+    # write) and the query, so a match is answered without touching the DB.
+    # The same version keys the cached page, so the two always agree.
+    # Estimated counts can move without a write, so they get no ETag.
+    version = await ItemService.get_collection_version()
+    etag = None
+    if count != "estimated" and version is not None:
+        etag = _make_etag(
+            "items", version, page, per_page, category, item_status, sort_by, order, cursor, count, selected, q
+        )
+        if _etag_matches(request, etag):
+            return _not_modified(etag)
+
+    try:
+        result = await ItemService.get_multi(
+            db, page=page, limit=per_page, category=category, status=item_status, sort_by=sort_by, order=order,
+            cursor=cursor, count_mode=count, fields=selected, q=q, version=version,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = None
+    if etag is not None:
+        headers = {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+    return _json_response(result, headers)
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+@router.get("/export")
+async def export_items(
+    session_factory = Depends(get_read_session_factory),
+    export_format: str = Query("ndjson", alias="format", regex="^(ndjson|csv)$"),
+    category: Optional[str] = None,
+    item_status: Optional[str] = Query(None, alias="status"),
+    sort_by: str = Query("created_at", regex="^(created_at|name|category)$"),
+    order: str = Query("desc", regex="^(asc|desc)$"),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Stream every item matching the list filters as NDJSON or CSV.
+    """
+    rows = ItemService.export(
+        session_factory, format=export_format, category=category, status=item_status,
+        sort_by=sort_by, order=order,
+    )
+    return StreamingResponse(
+        rows,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="items.{export_format}"'},
     )
-    return result
 
 @router.post("/", response_model=ItemResponse, status_code=status.HTTP_201_CREATED)
 async def create_item(
@@ -52,20 +183,99 @@ async def create_item(
     item = await ItemService.create(db=db, item_in=item_in)
     return item
 
+@router.post("/bulk", response_model=ItemBulkCreateResponse, status_code=status.HTTP_201_CREATED)
+async def create_items_bulk(
+    *,
+    db: AsyncSession = Depends(get_db),
+    bulk_in: ItemBulkCreate,
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Create many items in one transaction.
+
+    In `atomic` mode (default) any invalid row rejects the whole batch with 422;
+    in `partial` mode valid rows are created and the rest are listed in `errors`.
+    """
+    result = await ItemService.create_many(db=db, rows=bulk_in.items, mode=bulk_in.mode)
+    if bulk_in.mode == "atomic" and result["errors"]:
+        raise RequestValidationError(result["errors"])
+    return result
+
+@router.post("/import", response_model=ItemImportReport)
+async def import_items(
+    *,
+    db: AsyncSession = Depends(get_db),
+    file: UploadFile = File(...),
+    import_format: str = Query("csv", alias="format", regex="^(csv|ndjson)$"),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Import a CSV (header: name, category, status, optional id) or NDJSON file.
+
+    Rows are loaded with COPY; invalid rows are skipped and listed in the report,
+    rows whose id already exists are counted as duplicates.
+    """
+    try:
+        return await ItemService.import_items(db=db, stream=file.file, format=import_format)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Could not read the file: {e}")
+
+@router.post("/bulk/update", response_model=ItemBulkResult)
+async def update_items_bulk(
+    *,
+    db: AsyncSession = Depends(get_db),
+    bulk_in: ItemBulkUpdate,
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Apply the same update to every live item selected by ids and/or category/status.
+    A selection of more than ITEM_BULK_MAX_SIZE items is rejected with 422.
+    """
+    try:
+        return await ItemService.update_many(db=db, bulk_in=bulk_in)
+    except BulkSelectionTooLargeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@router.post("/bulk/delete", response_model=ItemBulkResult)
+async def delete_items_bulk(
+    *,
+    db: AsyncSession = Depends(get_db),
+    bulk_in: ItemBulkDelete,
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Soft delete every live item selected by ids and/or category/status.
+    A selection of more than ITEM_BULK_MAX_SIZE items is rejected with 422.
+    """
+    try:
+        return await ItemService.delete_many(db=db, bulk_in=bulk_in)
+    except BulkSelectionTooLargeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
 @router.get("/{id}", response_model=ItemResponse)
 async def read_item(
     *,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     id: UUID,
+    fields: Optional[str] = Query(None, description="Comma-separated item fields to return, e.g. id,name"),
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
     """
     Get item by ID.
+
+    Sends a strong ETag built from the (cached) read's updated_at, so a
+    matching If-None-Match gets 304 at no more cost than a cached read. With
+    `fields`, only the listed fields are returned.
     """
-    item = await ItemService.get(db=db, id=id)
-    if not item:
+    selected = _parse_fields(fields)
+    result = await ItemService.read(db=db, id=id, fields=selected)
+    if not result:
         raise HTTPException(status_code=404, detail="Item not found")
-    return item
+    etag = _make_etag("item", id, result["updated_at"], selected)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    return _json_response(result["item"], {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL})
 
 @router.put("/{id}", response_model=ItemResponse)
 async def update_item(
@@ -0,0 +1,83 @@
+"""
+Operational commands, run as `python -m app.cli <command>`.
+"""
+import argparse
+import asyncio
+import sys
+
+from redis.exceptions import RedisError
+
+from app.core.database import AsyncSessionLocal
+from app.core.redis import redis_client
+from app.repositories.item_repository import item_repository
+from app.services.item_service import ItemService
+
+
+async def reconcile_category_counts(args: argparse.Namespace) -> int:
+    async with AsyncSessionLocal() as db:
+        drift = await item_repository.reconcile_category_counts(db, dry_run=args.dry_run)
+
+    if not drift:
+        print("Category counters are in sync.")
+        return 0
+
+    for row in drift:
+        print(f"{row['category']}: stored={row['stored']} actual={row['actual']} ({row['actual'] - row['stored']:+d})")
+    print(f"{len(drift)} categories drifted" + (" (dry run, nothing changed)" if args.dry_run else ", counters rebuilt"))
+    return 1 if args.dry_run else 0
+
+
+async def import_items(args: argparse.Namespace) -> int:
+    import_format = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+
+    # Needed to invalidate cached item reads; without it they expire on their TTL
+    try:
+        await redis_client.connect()
+    except (RedisError, OSError) as e:
+        print(f"Redis unavailable ({e}); cached item reads are not invalidated", file=sys.stderr)
+        await redis_client.close()
+        redis_client.redis_client = None
+
+    try:
+        with open(args.path, "rb") as stream:
+            async with AsyncSessionLocal() as db:
+                report = await ItemService.import_items(db, stream, format=import_format)
+    finally:
+        await redis_client.close()
+
+    print(
+        f"Imported {report['imported']} of {report['received']} rows in {report['seconds']}s "
+        f"({report['rows_per_second']} rows/s); {report['duplicates']} duplicate ids skipped, "
+        f"{report['rejected']} rows rejected"
+    )
+    for error in report["errors"]:
+        print(f"  row {error['row']}: {error['message']}")
+    if report["rejected"] > len(report["errors"]):
+        print(f"  ... and {report['rejected'] - len(report['errors'])} more")
+    return 1 if report["rejected"] else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    reconcile = subparsers.add_parser(
+        "reconcile-category-counts",
+        help="Rebuild item_category_counts from items and report any drift",
+    )
+    reconcile.add_argument("--dry-run", action="store_true", help="Only report drift, do not rewrite counters")
+    reconcile.set_defaults(handler=reconcile_category_counts)
+
+    importer = subparsers.add_parser("import-items", help="Bulk-load items from a CSV or NDJSON file with COPY")
+    importer.add_argument("path", help="File to import; CSV needs a header row")
+    importer.add_argument(
+        "--format", choices=["csv", "ndjson"], help="Defaults to ndjson for .ndjson/.jsonl files, csv otherwise"
+    )
+    importer.set_defaults(handler=import_items)
+
+    args = parser.parse_args(argv)
+    return asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
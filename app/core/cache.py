@@ -0,0 +1,383 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from redis.exceptions import RedisError
+
+from app.core.logging import logger
+from app.core.redis import redis_client
+
+Compute = Callable[[], Awaitable[Any]]
+
+_MISSING = object()
+
+# Stores a TaggedCache entry and indexes it under its tags, unless the
+# namespace has seen a tag invalidation since the value was read (KEYS[2]
+# no longer holds ARGV[1]). KEYS: entry, invalidation counter, tag sets.
+_FILL_UNLESS_INVALIDATED = """
+if (redis.call('get', KEYS[2]) or '') ~= ARGV[1] then
+    return 0
+end
+redis.call('set', KEYS[1], ARGV[2], 'ex', ARGV[3])
+for i = 3, #KEYS do
+    redis.call('sadd', KEYS[i], KEYS[1])
+    redis.call('expire', KEYS[i], ARGV[3])
+end
+return 1
+"""
+
+
+class TTLCache:
+    """
+    Bounded in-process LRU whose entries also expire after a TTL.
+    Not shared between workers; pair it with Redis where that matters.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Stores `value`; `ttl` overrides the default lifetime for this entry.
+        """
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Any) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class ComputationCache:
+    """
+    Redis-backed cache for expensive, JSON-serializable computations.
+
+    - Single-flight: on a miss only one caller per process runs `compute` (the
+      rest await the same future), and a Redis lock keeps other workers from
+      recomputing in parallel; they poll for the winner's result instead.
+    - Stale-while-revalidate: entries are fresh until `soft_ttl`, then served
+      as-is while one background refresh runs, and expire at `hard_ttl`.
+    """
+
+    def __init__(self, lock_ttl: int = 30, wait_timeout: float = 5.0, poll_interval: float = 0.05):
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refreshing: Set[str] = set()
+        self._refresh_tasks: Set[asyncio.Task] = set()
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Compute,
+        *,
+        soft_ttl: int,
+        hard_ttl: int,
+        refresh: Optional[Compute] = None,
+    ) -> Any:
+        """
+        Returns the cached value for `key`, computing it on a miss.
+
+        `refresh` is used for background revalidation and defaults to `compute`;
+        pass a separate callable when `compute` depends on request-scoped
+        resources (such as the request's DB session) that are gone by then.
+        """
+        entry = await self._read(key)
+        if entry is not None:
+            if time.time() >= entry["fresh_until"]:
+                await self._schedule_refresh(key, refresh or compute, soft_ttl, hard_ttl)
+            return entry["value"]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._compute_once(key, compute, soft_ttl, hard_ttl)
+        except BaseException as e:
+            future.set_exception(e)
+            # Nobody may be waiting; mark the exception as retrieved
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            del self._inflight[key]
+
+    async def invalidate(self, key: str) -> None:
+        await redis_client.delete_value(key)
+
+    async def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = await redis_client.get_value(key)
+        if raw is None:
+            return None
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            return None
+        if not isinstance(entry, dict) or "fresh_until" not in entry:
+            return None
+        return entry
+
+    async def _write(self, key: str, value: Any, soft_ttl: int, hard_ttl: int) -> None:
+        entry = {"value": value, "fresh_until": time.time() + soft_ttl}
+        await redis_client.set_value(key, json.dumps(entry), expire=hard_ttl)
+
+    async def _compute_once(self, key: str, compute: Compute, soft_ttl: int, hard_ttl: int) -> Any:
+        if redis_client.redis_client is None:
+            return await compute()
+
+        lock_key, token = f"{key}:lock", uuid.uuid4().hex
+        if not await redis_client.set_value_if_absent(lock_key, token, expire=self.lock_ttl):
+            # Another worker is computing: wait for its result, but fail open
+            # and compute ourselves if it does not show up in time.
+            deadline = time.monotonic() + self.wait_timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.poll_interval)
+                entry = await self._read(key)
+                if entry is not None:
+                    return entry["value"]
+            logger.warning("Timed out waiting for %s to be computed elsewhere", key)
+            return await compute()
+
+        try:
+            value = await compute()
+            await self._write(key, value, soft_ttl, hard_ttl)
+            return value
+        finally:
+            await redis_client.delete_value_if_equals(lock_key, token)
+
+    async def _schedule_refresh(self, key: str, refresh: Compute, soft_ttl: int, hard_ttl: int) -> None:
+        if key in self._refreshing:
+            return
+        lock_key, token = f"{key}:lock", uuid.uuid4().hex
+        if not await redis_client.set_value_if_absent(lock_key, token, expire=self.lock_ttl):
+            return
+
+        async def _run():
+            try:
+                value = await refresh()
+                await self._write(key, value, soft_ttl, hard_ttl)
+            except Exception:
+                logger.exception("Background refresh of %s failed", key)
+            finally:
+                await redis_client.delete_value_if_equals(lock_key, token)
+                self._refreshing.discard(key)
+
+        self._refreshing.add(key)
+        task = asyncio.create_task(_run())
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+
+class TaggedCache:
+    """
+    Redis read-through cache whose entries are tagged for group invalidation.
+
+    Entries live under `cache:{namespace}:{name}:{args digest}`; every tag is a
+    Redis set of the entry keys carrying it, so invalidating a tag deletes
+    exactly those entries. Invalidating more than `max_tags` tags at once
+    bumps the namespace generation instead, which every entry records and
+    every read checks: one INCR retires the whole namespace.
+
+    Every tag invalidation also moves an invalidation counter on. A fill is
+    only stored if the counter has not moved since its miss, so a value read
+    before a write cannot be cached after the write's invalidation. Values
+    must be JSON-serializable. Redis errors are logged; on reads and fills
+    they count as misses.
+    """
+
+    def __init__(self, namespace: str, ttl: int, max_bytes: int, enabled: bool = True, max_tags: int = 100):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.max_tags = max_tags
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.oversize = 0
+        self.raced = 0  # Fills dropped because an invalidation ran while they were computed
+
+    def _entry_key(self, name: str, args: Dict[str, Any]) -> str:
+        digest = hashlib.sha1(json.dumps(args, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        return f"cache:{self.namespace}:{name}:{digest}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"cache:{self.namespace}:tag:{tag}"
+
+    @property
+    def _generation_key(self) -> str:
+        return f"cache:{self.namespace}:generation"
+
+    @property
+    def _invalidations_key(self) -> str:
+        return f"cache:{self.namespace}:invalidations"
+
+    async def get(self, key: str) -> Tuple[Any, Optional[str], Optional[str]]:
+        """
+        Returns (value or _MISSING, current generation, invalidation counter).
+        Pass both on to `set`, so a fill computed before an invalidation is
+        never served after it.
+        """
+        client = redis_client.redis_client
+        raw = generation = invalidations = None
+        if client is not None:
+            try:
+                with redis_client.timed("MGET"):
+                    raw, generation, invalidations = await client.mget(
+                        key, self._generation_key, self._invalidations_key
+                    )
+            except RedisError:
+                logger.warning("Cache read of %s failed", key, exc_info=True)
+        entry = json.loads(raw) if raw is not None else None
+        # Entries written before generations existed hold the bare value
+        if not isinstance(entry, dict) or "v" not in entry or entry.get("g") != generation:
+            self.misses += 1
+            return _MISSING, generation, invalidations
+        self.hits += 1
+        return entry["v"], generation, invalidations
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        tags: Iterable[str],
+        generation: Optional[str] = None,
+        invalidations: Optional[str] = None,
+    ) -> None:
+        client = redis_client.redis_client
+        if client is None:
+            return
+        payload = json.dumps({"g": generation, "v": value}, default=str)
+        if len(payload) > self.max_bytes:
+            self.oversize += 1
+            return
+        # A tag set only needs to outlive the entries it points to, so it shares their TTL
+        keys = [key, self._invalidations_key, *(self._tag_key(tag) for tag in tags)]
+        try:
+            with redis_client.timed("EVAL"):
+                stored = await client.eval(
+                    _FILL_UNLESS_INVALIDATED, len(keys), *keys, invalidations or "", payload, self.ttl
+                )
+        except RedisError:
+            logger.warning("Cache fill of %s failed", key, exc_info=True)
+            return
+        if not stored:
+            self.raced += 1
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        client = redis_client.redis_client
+        if client is None or not tags:
+            return
+        if len(tags) > self.max_tags:
+            await self.invalidate_all()
+            return
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                # Moved on before the tag sets are read: a fill that lands
+                # after this is refused, one that landed before is in the sets
+                pipe.incr(self._invalidations_key)
+                for tag_key in tag_keys:
+                    pipe.smembers(tag_key)
+                with redis_client.timed("PIPELINE"):
+                    _, *members = await pipe.execute()
+            keys = set().union(*members)
+            if keys:
+                with redis_client.timed("DEL"):
+                    self.evictions += await client.delete(*keys)
+            with redis_client.timed("DEL"):
+                await client.delete(*tag_keys)
+        except RedisError:
+            logger.warning("Cache invalidation of %s failed", ", ".join(tags), exc_info=True)
+
+    async def invalidate_all(self) -> None:
+        """
+        Retires every entry of the namespace; they expire with their TTL.
+        """
+        client = redis_client.redis_client
+        if client is None:
+            return
+        try:
+            with redis_client.timed("INCR"):
+                await client.incr(self._generation_key)
+        except RedisError:
+            logger.warning("Cache invalidation of namespace %s failed", self.namespace, exc_info=True)
+
+    def cached(self, name: str, tags: Callable[..., Iterable[str]], exclude: Iterable[str] = ("db",)):
+        """
+        Decorates an async function so its result is cached under its
+        normalized arguments (defaults applied, `exclude`d ones dropped).
+        `tags(result, **arguments)` names the tags of a new entry. None results
+        are not cached.
+        """
+        exclude = set(exclude)
+
+        def decorator(func):
+            signature = inspect.signature(func)
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return await func(*args, **kwargs)
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                arguments = {k: v for k, v in bound.arguments.items() if k not in exclude}
+                key = self._entry_key(name, arguments)
+
+                value, generation, invalidations = await self.get(key)
+                if value is not _MISSING:
+                    return value
+                value = await func(*args, **kwargs)
+                if value is not None:
+                    await self.set(key, value, tags(value, **arguments), generation, invalidations)
+                return value
+
+            return wrapper
+        return decorator
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "oversize": self.oversize,
+            "raced": self.raced,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+computation_cache = ComputationCache()
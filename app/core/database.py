@@ -1,15 +1,39 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import asyncio
+import itertools
+import json
+import random
+import time
+from typing import Any, Callable, Dict, Iterator, Set
+
+from fastapi import Depends, Request
+from redis.exceptions import RedisError
+from sqlalchemy import Engine, Executable, event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import db_statement_duration, record_db
+from app.core.pool import InstrumentedPool
+from app.core.redis import redis_client
+
+# Statement kinds reported as-is in metrics; anything else counts as "OTHER"
+STATEMENT_KINDS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "EXPLAIN"}
+
+def _create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=False,  # Set to True to see SQL queries in logs
+        future=True,
+        poolclass=InstrumentedPool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+    )
 
 # SQLAlchemy 2.0 Async Engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=False,  # Set to True to see SQL queries in logs
-    future=True,
-    pool_size=settings.DATABASE_POOL_SIZE if hasattr(settings, 'DATABASE_POOL_SIZE') else 20,
-    max_overflow=settings.DATABASE_MAX_OVERFLOW if hasattr(settings, 'DATABASE_MAX_OVERFLOW') else 10,
-)
+engine = _create_engine(settings.DATABASE_URL)
 
 # Async Session Factory
 AsyncSessionLocal = async_sessionmaker(
@@ -19,8 +43,156 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False
 )
 
+# Optional read replicas, used round-robin by read-only paths
+read_engines = [_create_engine(url) for url in settings.DATABASE_READ_URLS]
+_replica_session_factories = itertools.cycle([
+    async_sessionmaker(bind=read_engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+    for read_engine in read_engines
+])
+
+# Redis key marking a client (see `client_key`: the user id for bearer
+# tokens) that wrote within DATABASE_READ_LAG_SECONDS; its reads stay on
+# the primary until the key expires. Set by ReadYourWritesMiddleware.
+RECENT_WRITER_KEY_PREFIX = "read_primary:"
+
+# request.state attribute set by `records_writes`
+WRITES_STATE = "writes"
+
 Base = declarative_base()
 
+def _statement_kind(statement: str) -> str:
+    head = statement.lstrip()[:8].split(None, 1)
+    kind = head[0].upper() if head else ""
+    return kind if kind in STATEMENT_KINDS else "OTHER"
+
+def _parameter_shape(parameters: Any, executemany: bool) -> str:
+    """
+    Types of a statement's bound parameters, never their values (which may be
+    personal data), e.g. "(UUID, str, int)" or "500 x (str, str)".
+    """
+    if executemany:
+        return f"{len(parameters)} x {_parameter_shape(parameters[0], False)}" if parameters else "[]"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{name}: {type(value).__name__}" for name, value in parameters.items()) + "}"
+    return "(" + ", ".join(type(value).__name__ for value in parameters or ()) + ")"
+
+# Strong references to in-flight EXPLAIN tasks
+_explain_tasks: Set[asyncio.Task] = set()
+
+def _plan_summary(plan: Dict[str, Any], depth: int = 0) -> Iterator[str]:
+    """
+    One line per plan node: its type, relation/index, estimates, actual
+    timings and buffer counts. Conditions and filters are left out on
+    purpose, since Postgres prints them with the bound values inlined.
+    """
+    target = "".join(
+        f" {label} {plan[key]}" for key, label in (("Index Name", "using"), ("Relation Name", "on")) if key in plan
+    )
+    yield (
+        f"{'  ' * depth}{plan['Node Type']}{target}"
+        f" (cost={plan['Startup Cost']}..{plan['Total Cost']} rows={plan['Plan Rows']})"
+        f" (actual time={plan.get('Actual Startup Time')}..{plan.get('Actual Total Time')}"
+        f" rows={plan.get('Actual Rows')} loops={plan.get('Actual Loops')})"
+        f" (shared hit={plan.get('Shared Hit Blocks')} read={plan.get('Shared Read Blocks')})"
+    )
+    for child in plan.get("Plans", []):
+        yield from _plan_summary(child, depth + 1)
+
+async def _explain_slow_statement(sync_engine: Engine, statement: str, parameters: Any) -> None:
+    # On a connection of its own, outside the slow statement's transaction:
+    # the original keeps running undisturbed, at the price of not seeing
+    # that transaction's uncommitted rows.
+    try:
+        async with AsyncEngine(sync_engine).connect() as connection:
+            result = await connection.exec_driver_sql(
+                f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters
+            )
+            explained = result.scalar()
+    except Exception:
+        logger.warning("Could not EXPLAIN slow statement: %s", statement, exc_info=True)
+        return
+    if isinstance(explained, str):
+        explained = json.loads(explained)
+    explained = explained[0]
+    logger.warning(
+        "Plan of slow statement: %s\n%s\nPlanning %.3f ms, execution %.3f ms",
+        statement, "\n".join(_plan_summary(explained["Plan"])),
+        explained.get("Planning Time", 0), explained.get("Execution Time", 0),
+    )
+
+def _log_slow_statement(conn, statement: str, parameters: Any, executemany: bool, kind: str, elapsed: float) -> None:
+    logger.warning(
+        "Slow statement (%.1f ms, parameters %s): %s",
+        elapsed * 1000, _parameter_shape(parameters, executemany), statement,
+    )
+    # EXPLAIN ANALYZE executes the statement again, so only plain reads qualify
+    if (
+        kind != "SELECT"
+        or executemany
+        or "FOR UPDATE" in statement
+        or random.random() >= settings.DATABASE_SLOW_QUERY_EXPLAIN_RATE
+    ):
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # A sync engine (Alembic, scripts): nothing to run the EXPLAIN on
+        return
+    task = loop.create_task(_explain_slow_statement(conn.engine, statement, parameters))
+    _explain_tasks.add(task)
+    task.add_done_callback(_explain_tasks.discard)
+
+# Registered on the Engine class so every engine (primary, replicas, tests) is timed
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    context._statement_started = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _observe_statement(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._statement_started
+    kind = _statement_kind(statement)
+    db_statement_duration.labels(kind).observe(elapsed)
+    record_db(elapsed)
+    # EXPLAINs are diagnostics themselves (including the ones issued from here)
+    if elapsed >= settings.DATABASE_SLOW_QUERY_SECONDS and kind != "EXPLAIN":
+        _log_slow_statement(conn, statement, parameters, executemany, kind, elapsed)
+
+def read_session_factory() -> Callable[[], AsyncSession]:
+    """
+    Session factory for read-only work: the next replica, or the primary when
+    there are none.
+    """
+    return next(_replica_session_factories) if read_engines else AsyncSessionLocal
+
+def records_writes(request: Request) -> None:
+    """
+    Dependency for routers whose non-GET routes write what the read-only
+    paths read: after a successful write, the client reads from the primary
+    until the replicas have caught up (see ReadYourWritesMiddleware).
+    """
+    if request.method not in ("GET", "HEAD", "OPTIONS"):
+        setattr(request.state, WRITES_STATE, True)
+
+def _recent_writer_key(request: Request) -> str:
+    # Imported here: rate_limit -> security -> models import this module
+    from app.core.rate_limit import client_key
+    return f"{RECENT_WRITER_KEY_PREFIX}{client_key(request)}"
+
+async def mark_recent_writer(request: Request) -> None:
+    if not read_engines:
+        return
+    try:
+        await redis_client.set_value(_recent_writer_key(request), "1", expire=settings.DATABASE_READ_LAG_SECONDS)
+    except RedisError:
+        logger.warning("Could not record a recent writer", exc_info=True)
+
+async def _reads_from_primary(request: Request) -> bool:
+    try:
+        return await redis_client.get_value(_recent_writer_key(request)) is not None
+    except RedisError:
+        # Whether the client just wrote is unknown: the primary is always current
+        return True
+
 # Dependency for API endpoints
 async def get_db():
     async with AsyncSessionLocal() as session:
@@ -28,3 +200,33 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+async def get_read_session_factory(request: Request) -> Callable[[], AsyncSession]:
+    """
+    Dependency for read-only work that opens (and closes) its own session,
+    such as a streamed response body that outlives `get_read_db`.
+    """
+    if not read_engines or await _reads_from_primary(request):
+        return AsyncSessionLocal
+    return read_session_factory()
+
+# Dependency for read-only endpoints; never write through this session
+async def get_read_db(session_factory: Callable[[], AsyncSession] = Depends(get_read_session_factory)):
+    async with session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+async def explain(db: AsyncSession, query: Executable, options: str = "FORMAT JSON") -> Dict[str, Any]:
+    """
+    Returns the top-level plan Postgres would use for `query`.
+    """
+    # Render with the session's own dialect so literals are quoted for the driver in use
+    compiled = query.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    connection = await db.connection()
+    result = await connection.exec_driver_sql(f"EXPLAIN ({options}) {compiled}")
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
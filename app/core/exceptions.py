@@ -2,6 +2,7 @@ from fastapi import Request, status
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
+from app.core.config import settings
 
 async def global_exception_handler(request: Request, exc: Exception):
     return JSONResponse(
@@ -21,6 +22,7 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
             "error": "HTTP_ERROR", # Can be more specific based on status code
             "message": str(exc.detail)
         },
+        headers=getattr(exc, "headers", None),
     )
 
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -33,3 +35,14 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
             "details": exc.errors() 
         },
     )
+
+async def password_hasher_busy_handler(request: Request, exc: Exception):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "success": False,
+            "error": "SERVICE_BUSY",
+            "message": "Too many concurrent authentication requests, please retry"
+        },
+        headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+    )
@@ -0,0 +1,103 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.logging import logger
+from app.core.redis import redis_client
+
+
+class HealthChecker:
+    """
+    Probes Postgres and Redis in the background, so readiness probes only read
+    the last result: however many pods and however often they are probed, each
+    worker opens at most one check per HEALTH_CHECK_INTERVAL_SECONDS.
+
+    Every dependency is reported with its status and probe latency. Not ready
+    until the first check has run, or when the last one is too old to trust
+    (the checker itself is stuck).
+    """
+
+    # Results older than this many intervals count as unhealthy
+    STALE_AFTER_INTERVALS = 3
+
+    def __init__(self):
+        self.result: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        if self.result is None:
+            return False
+        max_age = settings.HEALTH_CHECK_INTERVAL_SECONDS * self.STALE_AFTER_INTERVALS
+        return self.result["status"] == "ready" and time.monotonic() - self._checked_at <= max_age
+
+    def report(self) -> Dict[str, Any]:
+        if self.result is None:
+            return {"status": "starting", "checks": {}}
+        return {**self.result, "status": "ready" if self.ready else "unavailable"}
+
+    async def refresh(self) -> Dict[str, Any]:
+        database, redis = await asyncio.gather(
+            self._probe(self._probe_database), self._probe(self._probe_redis)
+        )
+        checks = {"database": database, "redis": redis}
+        ready = all(check["status"] == "up" for check in checks.values())
+        self.result = {"status": "ready" if ready else "unavailable", "checks": checks}
+        self._checked_at = time.monotonic()
+        return self.result
+
+    async def start(self) -> None:
+        if self._task is None:
+            await self.refresh()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.HEALTH_CHECK_INTERVAL_SECONDS)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Health check failed")
+
+    async def _probe(self, probe: Callable[[], Awaitable[None]]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(probe(), timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            status, error = "down", f"timed out after {settings.HEALTH_CHECK_TIMEOUT_SECONDS}s"
+        except Exception as e:
+            status, error = "down", f"{type(e).__name__}: {e}"
+        else:
+            status, error = "up", None
+        check = {"status": status, "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+        if error is not None:
+            check["error"] = error
+        return check
+
+    @staticmethod
+    async def _probe_database() -> None:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    @staticmethod
+    async def _probe_redis() -> None:
+        if redis_client.redis_client is None:
+            raise ConnectionError("not connected")
+        await redis_client.redis_client.ping()
+
+
+health_checker = HealthChecker()
@@ -0,0 +1,229 @@
+import bisect
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Seconds; suits DB/Redis round trips and HTTP request latencies alike
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Buckets are upper bounds; snapshots report them
+    cumulatively (Prometheus style), with a final "+Inf" bucket.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        buckets, running = {}, 0
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            running += count
+            buckets[bound] = running
+        return {"count": self.count, "sum": round(self.sum, 6), "buckets": buckets}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+class HistogramFamily:
+    """
+    One histogram per combination of label values. Keep label values bounded
+    (route templates, not raw paths): every combination is kept for the life
+    of the process.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._children: Dict[Tuple[str, ...], Histogram] = {}
+
+    def labels(self, *values: str) -> Histogram:
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = Histogram(self.buckets)
+        return child
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        bucket_names = (*self.labelnames, "le")
+        bounds = [*map(repr, self.buckets), "+Inf"]
+        for values, child in list(self._children.items()):
+            running = 0
+            for bound, count in zip(bounds, child.counts):
+                running += count
+                yield f"{self.name}_bucket{_labels(bucket_names, (*values, bound))} {running}"
+            yield f"{self.name}_sum{_labels(self.labelnames, values)} {child.sum!r}"
+            yield f"{self.name}_count{_labels(self.labelnames, values)} {child.count}"
+
+
+class CallbackFamily:
+    """
+    Gauge or counter whose samples are read from `collect` at scrape time, for
+    values another component already keeps (such as cache hit counters).
+    `collect` returns {label values: sample}.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        kind: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Dict[Tuple[str, ...], float]],
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for values, sample in self.collect().items():
+            yield f"{self.name}{_labels(self.labelnames, values)} {sample!r}"
+
+
+class MetricsRegistry:
+    """
+    In-process metrics, rendered in the Prometheus text exposition format.
+    Each worker process keeps (and serves) its own samples.
+    """
+
+    def __init__(self):
+        self._families: List[Any] = []
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> HistogramFamily:
+        family = HistogramFamily(name, documentation, labelnames, buckets)
+        self._families.append(family)
+        return family
+
+    def callback(
+        self,
+        name: str,
+        documentation: str,
+        kind: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Dict[Tuple[str, ...], float]],
+    ) -> CallbackFamily:
+        family = CallbackFamily(name, documentation, kind, labelnames, collect)
+        self._families.append(family)
+        return family
+
+    def render(self) -> str:
+        return "\n".join(line for family in self._families for line in family.render()) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route", "status")
+)
+db_statement_duration = registry.histogram(
+    "db_statement_duration_seconds", "Time spent executing SQL statements by kind.", ("operation",)
+)
+redis_command_duration = registry.histogram(
+    "redis_command_duration_seconds", "Redis round trip time by command.", ("command",)
+)
+
+# Cache name -> callable returning its (hits, misses) counters
+_cache_counters: Dict[str, Callable[[], Tuple[int, int]]] = {}
+
+
+def register_cache(name: str, counters: Callable[[], Tuple[int, int]]) -> None:
+    """
+    Exposes a cache's hit/miss counters (and their ratio) under `cache="name"`.
+    """
+    _cache_counters[name] = counters
+
+
+def _cache_samples(pick: Callable[[int, int], Any]) -> Callable[[], Dict[Tuple[str, ...], float]]:
+    def collect() -> Dict[Tuple[str, ...], float]:
+        samples = {}
+        for name, counters in _cache_counters.items():
+            value = pick(*counters())
+            if value is not None:
+                samples[(name,)] = value
+        return samples
+    return collect
+
+
+registry.callback("cache_hits_total", "Cache lookups served from the cache.", "counter", ("cache",),
+                  _cache_samples(lambda hits, misses: hits))
+registry.callback("cache_misses_total", "Cache lookups that missed.", "counter", ("cache",),
+                  _cache_samples(lambda hits, misses: misses))
+registry.callback("cache_hit_ratio", "Share of cache lookups served from the cache.", "gauge", ("cache",),
+                  _cache_samples(lambda hits, misses: hits / (hits + misses) if hits + misses else None))
+
+
+class RequestStats:
+    """
+    SQL statements and Redis commands run on behalf of one request (or any
+    other tracked block). Blocks nest: work is also counted in every
+    enclosing block.
+    """
+
+    __slots__ = ("parent", "db_count", "db_seconds", "redis_count", "redis_seconds")
+
+    def __init__(self, parent: Optional["RequestStats"] = None):
+        self.parent = parent
+        self.db_count = 0
+        self.db_seconds = 0.0
+        self.redis_count = 0
+        self.redis_seconds = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+@contextmanager
+def track_request() -> Iterator[RequestStats]:
+    """
+    Accounts the SQL statements and Redis commands run inside the block.
+    """
+    stats = RequestStats(_request_stats.get())
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+
+def record_db(seconds: float) -> None:
+    stats = _request_stats.get()
+    while stats is not None:
+        stats.db_count += 1
+        stats.db_seconds += seconds
+        stats = stats.parent
+
+
+def record_redis(seconds: float) -> None:
+    stats = _request_stats.get()
+    while stats is not None:
+        stats.redis_count += 1
+        stats.redis_seconds += seconds
+        stats = stats.parent
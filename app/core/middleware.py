@@ -0,0 +1,138 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import database
+from app.core.metrics import http_request_duration, track_request
+from app.core.rate_limit import RATE_LIMIT_STATE
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class ReadYourWritesMiddleware:
+    """
+    Records clients that just made a successful write on a route marked by
+    `database.records_writes`, so `get_read_db` keeps their reads on the
+    primary until the replicas have caught up. Keyed by the authenticated
+    user rather than anything the client has to send back. Does nothing
+    while no read replica is configured.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS or not database.read_engines:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_recording_writer(message: Message) -> None:
+            # Recorded before the response goes out, so the client's next read sees it
+            if (
+                message["type"] == "http.response.start"
+                and message["status"] < 400
+                and scope.get("state", {}).get(database.WRITES_STATE)
+            ):
+                await database.mark_recent_writer(Request(scope))
+            await send(message)
+
+        await self.app(scope, receive, send_recording_writer)
+
+
+class MetricsMiddleware:
+    """
+    Records every HTTP request in `http_request_duration_seconds`, labelled by
+    method, route template (never the raw path, so label values stay bounded)
+    and response status. Requests no route matched share the "unmatched" label.
+    The timing covers the whole response, streamed bodies included.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            http_request_duration.labels(
+                scope["method"], route.path if route is not None else "unmatched", str(status)
+            ).observe(time.perf_counter() - start)
+
+
+class ServerTimingMiddleware:
+    """
+    Accounts the SQL statements and Redis commands each request runs and
+    reports them with the handler's own time in a Server-Timing header, e.g.
+    `db;dur=12.3;desc="4 queries", redis;dur=0.8;desc="2 calls", app;dur=20.1`
+    (milliseconds). Work done while a streamed body is sent comes after the
+    header and is not included.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        with track_request() as stats:
+
+            async def send_with_timing(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    total = (time.perf_counter() - start) * 1000
+                    MutableHeaders(scope=message).append(
+                        "server-timing",
+                        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.db_count} queries", '
+                        f'redis;dur={stats.redis_seconds * 1000:.1f};desc="{stats.redis_count} calls", '
+                        f"app;dur={total:.1f}",
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
+
+
+class RateLimitHeadersMiddleware:
+    """
+    Adds the RateLimit-* headers a `RateLimit` dependency computed for the
+    request to its response. Done here rather than in the dependency so they
+    also reach responses the route builds itself, and error responses.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # request.state lives in the scope shared with the route
+                rate_limit = scope.get("state", {}).get(RATE_LIMIT_STATE)
+                if rate_limit:
+                    response_headers = MutableHeaders(scope=message)
+                    for name, value in rate_limit.items():
+                        response_headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
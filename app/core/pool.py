@@ -0,0 +1,71 @@
+import time
+from typing import Any, Dict
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import Histogram
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long checkouts wait and how long new
+    connections take to open, and warns about slow checkouts. `waiting`
+    counts the checkouts that found every connection (overflow included)
+    taken and are queued for one to come back.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+        self.checkout_wait = Histogram()
+        self.connect_latency = Histogram()
+
+    def _exhausted(self) -> bool:
+        # A negative max_overflow means there is no limit
+        return self._max_overflow >= 0 and self.checkedout() >= self.size() + self._max_overflow
+
+    def connect(self):
+        queued = self._exhausted()
+        if queued:
+            self.waiting += 1
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            if queued:
+                self.waiting -= 1
+            waited = time.perf_counter() - start
+            self.checkout_wait.observe(waited)
+            if waited >= settings.DATABASE_POOL_SLOW_CHECKOUT_SECONDS:
+                logger.warning(
+                    "Waited %.3fs for a database connection (%s checked out, %s waiting)",
+                    waited, self.checkedout(), self.waiting,
+                )
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            self.connect_latency.observe(time.perf_counter() - start)
+
+
+def pool_status(engine: AsyncEngine) -> Dict[str, Any]:
+    pool = engine.pool
+    status = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # QueuePool counts overflow from -size upwards
+        "overflow": max(pool.overflow(), 0),
+    }
+    if isinstance(pool, InstrumentedPool):
+        status.update({
+            "waiting": pool.waiting,
+            "checkout_wait_seconds": pool.checkout_wait.snapshot(),
+            "connect_latency_seconds": pool.connect_latency.snapshot(),
+        })
+    return status
@@ -0,0 +1,117 @@
+import math
+import time
+from typing import Dict, Tuple
+
+from fastapi import HTTPException, Request, status
+from jose import JWTError
+from pydantic import ValidationError
+from redis.exceptions import RedisError
+
+from app.core import security
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.redis import redis_client
+
+# request.state attribute holding the RateLimit-* headers for the response
+# (added by RateLimitHeadersMiddleware, whatever response the route returns)
+RATE_LIMIT_STATE = "rate_limit_headers"
+
+Bucket = Tuple[bool, float, float]
+
+
+class LocalTokenBuckets:
+    """
+    In-process token buckets with the same semantics as the Redis script,
+    used while Redis is unavailable. Per worker, so the effective limit is
+    looser by the number of workers; least recently seen clients are dropped
+    beyond `maxsize`.
+    """
+
+    def __init__(self, maxsize: int):
+        self._buckets = TTLCache(maxsize=maxsize, ttl=3600)
+
+    def take(self, key: str, capacity: float, rate: float, cost: float = 1) -> Bucket:
+        now = time.monotonic()
+        tokens, ts = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - ts) * rate)
+        allowed, retry_after = tokens >= cost, 0.0
+        if allowed:
+            tokens -= cost
+        else:
+            retry_after = (cost - tokens) / rate
+        self._buckets.set(key, (tokens, now), ttl=capacity / rate + 1)
+        return allowed, tokens, retry_after
+
+
+_local_buckets = LocalTokenBuckets(settings.RATE_LIMIT_FALLBACK_MAX_CLIENTS)
+_redis_failing = False
+
+
+def client_key(request: Request) -> str:
+    """
+    The user id of a valid bearer token, otherwise the client address.
+    Verified tokens are cached, so this costs no more than authentication.
+    """
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            token_data = security.decode_token(token)
+        except (JWTError, ValidationError):
+            token_data = None
+        if token_data is not None and token_data.sub:
+            return f"user:{token_data.sub}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+async def _take(key: str, capacity: float, rate: float) -> Bucket:
+    global _redis_failing
+    try:
+        result = await redis_client.take_token(key, capacity, rate)
+    except RedisError:
+        if not _redis_failing:
+            logger.warning("Rate limiting falls back to in-process buckets", exc_info=True)
+        _redis_failing = True
+        result = None
+    else:
+        _redis_failing = False
+    if result is None:
+        return _local_buckets.take(key, capacity, rate)
+    return result
+
+
+class RateLimit:
+    """
+    Dependency limiting each client (see `client_key`) to `limit` requests
+    per `period` seconds on the routes using it, with bursts up to `limit`.
+
+    Every response carries RateLimit-Limit/-Remaining/-Reset and
+    RateLimit-Policy headers; rejected requests get a 429 with Retry-After.
+    """
+
+    def __init__(self, name: str, limit: int, period: float = 60):
+        self.name = name
+        self.limit = limit
+        self.period = period
+
+    async def __call__(self, request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        rate = self.limit / self.period
+        allowed, tokens, retry_after = await _take(f"ratelimit:{self.name}:{client_key(request)}", self.limit, rate)
+
+        headers: Dict[str, str] = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(int(tokens)),
+            # Seconds until the bucket is full again
+            "RateLimit-Reset": str(math.ceil((self.limit - tokens) / rate)),
+            "RateLimit-Policy": f"{self.limit};w={int(self.period)}",
+        }
+        setattr(request.state, RATE_LIMIT_STATE, headers)
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
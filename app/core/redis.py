@@ -1,6 +1,65 @@
-from typing import Optional
+import functools
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
 import redis.asyncio as redis
 from app.core.config import settings
+from app.core.metrics import record_redis, redis_command_duration
+
+_COMPARE_AND_DELETE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Token bucket check-and-take. State is a hash of the token count and the
+# (Redis server) time it was computed at; refills are applied lazily here.
+# Floats are returned as strings, Lua numbers would be truncated to integers.
+_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call('time')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('hmget', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('hset', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('expire', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+def _timed(command: str):
+    """
+    Records the round trip of a RedisClient method under `command`.
+    Calls made while disconnected are not recorded.
+    """
+    histogram = redis_command_duration.labels(command)
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            if self.redis_client is None:
+                return await func(self, *args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return await func(self, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                histogram.observe(elapsed)
+                record_redis(elapsed)
+        return wrapper
+    return decorator
 
 class RedisClient:
     def __init__(self):
@@ -20,17 +79,71 @@ class RedisClient:
         if self.redis_client:
             await self.redis_client.aclose()
 
+    @contextmanager
+    def timed(self, command: str) -> Iterator[None]:
+        """
+        Records a round trip made on `redis_client` directly (pipelines and
+        the like) the same way the methods below record theirs.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            redis_command_duration.labels(command).observe(elapsed)
+            record_redis(elapsed)
+
+    @_timed("SET")
     async def set_value(self, key: str, value: str, expire: int = None):
         if self.redis_client:
             await self.redis_client.set(key, value, ex=expire)
 
+    @_timed("SET")
+    async def set_value_if_absent(self, key: str, value: str, expire: int = None) -> bool:
+        if self.redis_client:
+            return bool(await self.redis_client.set(key, value, ex=expire, nx=True))
+        return False
+
+    @_timed("GET")
     async def get_value(self, key: str) -> Optional[str]:
         if self.redis_client:
             return await self.redis_client.get(key)
         return None
     
+    @_timed("DEL")
     async def delete_value(self, key: str):
         if self.redis_client:
             await self.redis_client.delete(key)
 
+    @_timed("PUBLISH")
+    async def publish(self, channel: str, message: str):
+        if self.redis_client:
+            await self.redis_client.publish(channel, message)
+
+    @_timed("EVAL")
+    async def delete_value_if_equals(self, key: str, value: str) -> bool:
+        """
+        Atomically deletes `key` only while it still holds `value` (lock release).
+        """
+        if self.redis_client:
+            return bool(await self.redis_client.eval(_COMPARE_AND_DELETE, 1, key, value))
+        return False
+
+    @_timed("EVAL")
+    async def take_token(
+        self, key: str, capacity: float, rate: float, cost: float = 1
+    ) -> Optional[Tuple[bool, float, float]]:
+        """
+        Atomically takes `cost` tokens from the bucket at `key` (holding up to
+        `capacity`, refilled at `rate` tokens per second) when it has them.
+        Returns (allowed, tokens left, seconds until `cost` tokens are
+        available), or None while disconnected.
+        """
+        if self.redis_client:
+            allowed, tokens, retry_after = await self.redis_client.eval(
+                _TOKEN_BUCKET, 1, key, capacity, rate, cost
+            )
+            return bool(allowed), float(tokens), float(retry_after)
+        return None
+
 redis_client = RedisClient()
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
+from app.core.logging import logger
+from app.core.redis import redis_client
+
+REVOKED_KEY_PREFIX = "revoked:"
+REVOCATION_CHANNEL = "auth:revocations"
+
+
+class RevocationList:
+    """
+    Revoked token ids (jti), mirrored in every worker.
+
+    Redis holds one `revoked:{jti}` key per revocation, expiring with the
+    token itself. Each worker keeps the same set in memory, loaded on startup
+    and fed by pub/sub, so checking a token that is not revoked (nearly
+    every request) costs a dict lookup instead of a Redis roundtrip.
+    """
+
+    PRUNE_EVERY = 1024
+
+    def __init__(self):
+        self._revoked: Dict[str, float] = {}  # jti -> token exp (epoch seconds)
+        self._adds_since_prune = 0
+        self._listener: Optional[asyncio.Task] = None
+
+    def is_revoked(self, jti: str) -> bool:
+        exp = self._revoked.get(jti)
+        if exp is None:
+            return False
+        if exp <= time.time():
+            # The token has expired on its own; no need to remember it
+            self._revoked.pop(jti, None)
+            return False
+        return True
+
+    async def revoke(self, jti: str, exp: float) -> None:
+        ttl = int(exp - time.time()) + 1
+        if ttl <= 0:
+            return
+        self._add(jti, exp)
+        await redis_client.set_value(f"{REVOKED_KEY_PREFIX}{jti}", str(int(exp)), expire=ttl)
+        await redis_client.publish(REVOCATION_CHANNEL, f"{jti}:{int(exp)}")
+
+    def _add(self, jti: str, exp: float) -> None:
+        self._revoked[jti] = exp
+        self._adds_since_prune += 1
+        if self._adds_since_prune >= self.PRUNE_EVERY:
+            now = time.time()
+            self._revoked = {j: e for j, e in self._revoked.items() if e > now}
+            self._adds_since_prune = 0
+
+    async def sync(self) -> None:
+        """
+        Loads every revocation currently stored in Redis.
+        """
+        client = redis_client.redis_client
+        if client is None:
+            return
+        async for key in client.scan_iter(match=f"{REVOKED_KEY_PREFIX}*", count=1000):
+            exp = await client.get(key)
+            if exp is not None:
+                self._add(key[len(REVOKED_KEY_PREFIX):], float(exp))
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self) -> None:
+        while True:
+            client = redis_client.redis_client
+            if client is None:
+                await asyncio.sleep(1)
+                continue
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(REVOCATION_CHANNEL)
+                # Sync after subscribing so nothing published in between is missed;
+                # this also catches up on anything lost while disconnected.
+                await self.sync()
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    jti, _, exp = message["data"].rpartition(":")
+                    self._add(jti, float(exp))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Token revocation listener disconnected, resubscribing", exc_info=True)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+
+revocation_list = RevocationList()
@@ -1,27 +1,63 @@
 from passlib.context import CryptContext
 
+import asyncio
+import hashlib
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional, Union, Any
 from jose import jwt
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.schemas.auth import TokenPayload
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 ALGORITHM = "HS256"
 
+# sha256(token) -> validated TokenPayload
+_token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_MAX_SIZE, ttl=settings.TOKEN_CACHE_TTL_SECONDS)
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password hash/verify calls are already waiting."""
+
+# bcrypt releases the GIL, so a thread pool keeps it off the event loop
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+_hash_pending = 0
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+async def _run_hashing(func, *args):
+    global _hash_pending
+    # Fail fast instead of queueing without bound behind a login burst
+    if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise PasswordHasherBusy()
+    _hash_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_pending -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hashing(get_password_hash, password)
+
 def create_access_token(subject: Union[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15) # Default
     
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {"exp": expire, "sub": str(subject), "jti": uuid.uuid4().hex}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -31,6 +67,30 @@ def create_refresh_token(subject: Union[str, Any], expires_delta: Optional[timed
     else:
         expire = datetime.utcnow() + timedelta(days=7) # Default
         
-    to_encode = {"exp": expire, "sub": str(subject), "type": "refresh"}
+    to_encode = {"exp": expire, "sub": str(subject), "type": "refresh", "jti": uuid.uuid4().hex}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
+
+def decode_token(token: str) -> TokenPayload:
+    """
+    Verifies `token` and returns its validated payload.
+    Raises JWTError or ValidationError like jwt.decode / TokenPayload would.
+    """
+    if not settings.TOKEN_CACHE_ENABLED:
+        return _decode_token(token)
+
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    token_data = _token_cache.get(key)
+    if token_data is None:
+        token_data = _decode_token(token)
+        # Never cache past exp, so an expired token always goes back through jwt.decode
+        ttl = settings.TOKEN_CACHE_TTL_SECONDS
+        if token_data.exp is not None:
+            ttl = min(ttl, token_data.exp - time.time())
+        if ttl > 0:
+            _token_cache.set(key, token_data, ttl=ttl)
+    return token_data
+
+def _decode_token(token: str) -> TokenPayload:
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    return TokenPayload(**payload)
@@ -1,19 +1,33 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
-from app.core.database import get_db
+from app.core.health import health_checker
+from app.core.metrics import CONTENT_TYPE, registry
+from app.core.middleware import (
+    MetricsMiddleware,
+    RateLimitHeadersMiddleware,
+    ReadYourWritesMiddleware,
+    ServerTimingMiddleware,
+)
 from app.core.redis import redis_client
+from app.core.revocation import revocation_list
 from app.core.logging import setup_logging
+from app.services.user_cache import user_cache
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     setup_logging()
     await redis_client.connect()
+    await revocation_list.start()
+    await user_cache.start()
+    await health_checker.start()
     yield
     # Shutdown
+    await health_checker.stop()
+    await user_cache.stop()
+    await revocation_list.stop()
     await redis_client.close()
 
 app = FastAPI(
@@ -44,32 +58,52 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(RateLimitHeadersMiddleware)
+app.add_middleware(ServerTimingMiddleware)
+# Added last so it wraps everything else and times the full request
+app.add_middleware(MetricsMiddleware)
 
 @app.get("/")
 async def root():
     return {"message": "Service is up and running"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    # Per worker process: scrape each worker, or run a single one per target
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+@app.get("/livez", include_in_schema=False)
+async def liveness():
+    # No I/O: a dependency outage must not get the process restarted
+    return {"status": "alive"}
+
+@app.get("/readyz", include_in_schema=False)
+async def readiness():
+    # The last background check; probes never touch Postgres or Redis themselves
+    return JSONResponse(health_checker.report(), status_code=200 if health_checker.ready else 503)
+
 @app.get("/health")
-async def health_check(db: AsyncSession = Depends(get_db)):
-    try:
-        # Simple query to check DB connection
-        await db.execute(text("SELECT 1"))
-        return {"status": "healthy", "database": "connected"}
-    except Exception as e:
-        return {"status": "unhealthy", "database": "disconnected", "error": str(e)}
+async def health_check():
+    return await readiness()
 
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from app.core.exceptions import (
     global_exception_handler,
     http_exception_handler,
+    password_hasher_busy_handler,
     validation_exception_handler
 )
+from app.core.security import PasswordHasherBusy
 
 from app.api.v1.api import api_router
+from app.api.internal import router as internal_router
 
 app.include_router(api_router, prefix="/api/v1")
+app.include_router(internal_router, prefix="/internal", include_in_schema=False)
 
 app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
+app.add_exception_handler(PasswordHasherBusy, password_hasher_busy_handler)
 app.add_exception_handler(Exception, global_exception_handler)
@@ -1,2 +1,2 @@
 from app.models.user import User
-from app.models.item import Item
+from app.models.item import Item, ItemCategoryCount
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Enum, Boolean
+from sqlalchemy import DDL, Column, String, DateTime, Enum, Boolean, BigInteger, Index, event, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -11,12 +11,45 @@ class ItemStatus(str, enum.Enum):
     INACTIVE = "inactive"
     DRAFT = "draft"
 
+# Column sets of the partial indexes serving the live-item list queries:
+# (equality filters..., sort column, id) for every category/status filter
+# combination and sort_by value ItemRepository generates. When the sort column
+# is itself an equality filter it is dropped, since it is constant there.
+LIVE_ITEM_INDEXES = {
+    "ix_items_live_created_at": ("created_at", "id"),
+    "ix_items_live_name": ("name", "id"),
+    "ix_items_live_category": ("category", "id"),
+    "ix_items_live_category_created_at": ("category", "created_at", "id"),
+    "ix_items_live_category_name": ("category", "name", "id"),
+    "ix_items_live_status_created_at": ("status", "created_at", "id"),
+    "ix_items_live_status_name": ("status", "name", "id"),
+    "ix_items_live_status_category": ("status", "category", "id"),
+    "ix_items_live_category_status_created_at": ("category", "status", "created_at", "id"),
+    "ix_items_live_category_status_name": ("category", "status", "name", "id"),
+    "ix_items_live_category_status": ("category", "status", "id"),
+}
+
 class Item(Base):
     __tablename__ = "items"
+    __table_args__ = tuple(
+        Index(name, *columns, postgresql_where=text("deleted_at IS NULL"))
+        for name, columns in LIVE_ITEM_INDEXES.items()
+    ) + (
+        # Trigram index behind the `q` name search (ILIKE and word similarity)
+        Index(
+            "ix_items_live_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False)
-    category = Column(String, index=True, nullable=False)
+    # Indexed only through the live-item indexes above: every query filtering
+    # on it is restricted to live rows
+    category = Column(String, nullable=False)
     status = Column(String, default=ItemStatus.ACTIVE, nullable=False)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -25,3 +58,21 @@ class Item(Base):
 
     def __repr__(self):
         return f"<Item {self.name}>"
+
+
+# gin_trgm_ops comes from pg_trgm; make create_all work on a fresh database too
+event.listen(Item.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+
+class ItemCategoryCount(Base):
+    """
+    Live (non-deleted) item count per category, kept in step with items by
+    ItemRepository in the same transaction as each write.
+    """
+    __tablename__ = "item_category_counts"
+
+    category = Column(String, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0, server_default=text("0"))
+
+    def __repr__(self):
+        return f"<ItemCategoryCount {self.category}={self.count}>"
@@ -1,7 +1,7 @@
 from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
 from uuid import UUID
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import Base
 
@@ -27,10 +27,13 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
     async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = obj_in.model_dump()
-        db_obj = self.model(**obj_in_data)
-        db.add(db_obj)
+        # RETURNING brings server defaults (created_at, ...) back with the insert,
+        # so no refresh roundtrip is needed after commit
+        result = await db.execute(
+            insert(self.model).values(**obj_in_data).returning(self.model)
+        )
+        db_obj = result.scalars().one()
         await db.commit()
-        await db.refresh(db_obj)
         return db_obj
 
     async def update(
@@ -45,13 +48,21 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         else:
             update_data = obj_in.model_dump(exclude_unset=True)
             
-        for field in update_data:
-            if hasattr(db_obj, field):
-                setattr(db_obj, field, update_data[field])
-                
-        db.add(db_obj)
+        values = {field: value for field, value in update_data.items() if hasattr(self.model, field)}
+        if not values:
+            return db_obj
+
+        # One UPDATE ... RETURNING instead of flush + refresh; populate_existing
+        # refreshes db_obj in place when it belongs to this session
+        result = await db.execute(
+            update(self.model)
+            .where(self.model.id == db_obj.id)
+            .values(**values)
+            .returning(self.model)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        db_obj = result.scalars().one()
         await db.commit()
-        await db.refresh(db_obj)
         return db_obj
 
     async def delete(self, db: AsyncSession, *, db_obj: ModelType) -> ModelType:
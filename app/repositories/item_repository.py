@@ -1,125 +1,694 @@
-from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import uuid
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+from uuid import UUID
 from datetime import datetime
-from sqlalchemy import select, func
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.item import Item, ItemStatus
+from sqlalchemy import (
+    Column, MetaData, Row, Select, String, Table, delete, insert, literal, or_, select, func, text, tuple_, update
+)
+from redis.exceptions import RedisError
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+from app.core.cache import computation_cache
+from app.core.config import settings
+from app.core.database import explain, read_session_factory
+from app.core.logging import logger
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from app.core.redis import redis_client
+from app.models.item import Item, ItemCategoryCount, ItemStatus
 from app.schemas.item import ItemCreate, ItemUpdate
 from app.repositories.base import BaseRepository
 
+# Changes on every write; list-level cache keys embed it, so bumping it
+# invalidates all of them at once without scanning Redis.
+COLLECTION_VERSION_KEY = "items:collection_version"
+
+
+# Column order of the records handed to copy_import
+IMPORT_COLUMNS = ("id", "name", "category", "status")
+
+
+class BulkSelectionTooLargeError(ValueError):
+    """Raised when a bulk update/delete selects more than ITEM_BULK_MAX_SIZE items."""
+
 class ItemRepository(BaseRepository[Item, ItemCreate, ItemUpdate]):
-    async def get_multi_paginated(
-        self, 
-        db: AsyncSession, 
-        page: int = 1, 
-        limit: int = 10, 
+    def _filtered_query(
+        self,
         category: Optional[str] = None,
         status: Optional[str] = None,
-        sort_by: str = "created_at",
-        order: str = "desc"
-    ) -> Dict[str, Any]:
-        skip = (page - 1) * limit
-        
+        q: Optional[str] = None,
+    ) -> Select:
         # Base query (Soft Delete check)
         query = select(self.model).where(self.model.deleted_at.is_(None))
-        
+
         # Filters
         if category:
             query = query.where(self.model.category == category)
         if status:
             query = query.where(self.model.status == status)
-            
-        # Count total items
+        if q:
+            # Substring or fuzzy word match; both are served by ix_items_live_name_trgm
+            query = query.where(or_(
+                self.model.name.icontains(q, autoescape=True),
+                literal(q).op("<%")(self.model.name),
+            ))
+        return query
+
+    def _ranked_query(self, query: Select, q: str) -> Select:
+        """
+        Orders search results by relevance: best-matching word first, then
+        closest overall name, id breaking ties.
+        """
+        return query.order_by(
+            func.word_similarity(q, self.model.name).desc(),
+            func.similarity(self.model.name, q).desc(),
+            self.model.id.asc(),
+        )
+
+    def _sort_column(self, sort_by: str):
+        return getattr(self.model, sort_by, self.model.created_at)
+
+    def _ordered_query(
+        self,
+        query: Select,
+        sort_by: str,
+        order: str,
+        position: Optional[Dict[str, Any]] = None,
+    ) -> Select:
+        """
+        Applies the list ordering and, for cursor pages, the keyset predicate.
+        The partial indexes on items are shaped after exactly these queries.
+        """
+        # Sorting (id breaks ties so every row has a unique position)
+        sort_column = self._sort_column(sort_by)
+        descending = order != "asc"
+        backwards = position is not None and position["direction"] == "prev"
+        if position is not None:
+            key = tuple_(sort_column, self.model.id)
+            bound = (position["value"], position["id"])
+            query = query.where(key < bound if descending != backwards else key > bound)
+
+        if descending != backwards:
+            return query.order_by(sort_column.desc(), self.model.id.desc())
+        return query.order_by(sort_column.asc(), self.model.id.asc())
+
+    def _decode_position(self, cursor: str, sort_by: str, order: str) -> Dict[str, Any]:
+        """
+        Turns an opaque cursor back into the (sort value, id) pair it was built from.
+        """
+        payload = decode_cursor(cursor)
+        if payload.get("s") != sort_by or payload.get("o") != order:
+            raise InvalidCursorError("Cursor does not match the requested sort_by/order")
+        if payload.get("d") not in ("next", "prev"):
+            raise InvalidCursorError("Malformed cursor")
+
+        try:
+            item_id = UUID(payload["id"])
+            value = payload["v"]
+            if sort_by == "created_at":
+                value = datetime.fromisoformat(value)
+            elif not isinstance(value, str):
+                raise TypeError(value)
+        except (KeyError, TypeError, ValueError):
+            raise InvalidCursorError("Malformed cursor")
+
+        return {"value": value, "id": item_id, "direction": payload["d"]}
+
+    def _encode_position(self, item: Union[Item, Row], sort_by: str, order: str, direction: str) -> str:
+        value = getattr(item, self._sort_column(sort_by).key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        return encode_cursor({"s": sort_by, "o": order, "v": value, "id": str(item.id), "d": direction})
+
+    async def get_live_row(
+        self, db: AsyncSession, id: UUID, columns: Optional[Sequence[str]] = None
+    ) -> Optional[Row]:
+        """
+        The given columns (default: all) of a live item as a plain row.
+        """
+        table = self.model.__table__
+        query = select(*(table.c[name] for name in columns or table.c.keys()))
+        result = await db.execute(query.where(table.c.id == id, table.c.deleted_at.is_(None)))
+        return result.first()
+
+    async def get_collection_version(self) -> Optional[str]:
+        """
+        Current version token of the live item collection, or None without Redis
+        (or while it fails: callers then go without ETags and cached counts).
+        """
+        try:
+            version = await redis_client.get_value(COLLECTION_VERSION_KEY)
+            if version is None and redis_client.redis_client:
+                await redis_client.set_value_if_absent(COLLECTION_VERSION_KEY, uuid.uuid4().hex)
+                version = await redis_client.get_value(COLLECTION_VERSION_KEY)
+        except RedisError:
+            logger.warning("Could not read the item collection version", exc_info=True)
+            return None
+        return version
+
+    async def bump_collection_version(self) -> None:
+        # A random token rather than INCR: a counter restarting after a Redis flush
+        # could hand out a version that is already baked into old cache entries.
+        await redis_client.set_value(COLLECTION_VERSION_KEY, uuid.uuid4().hex)
+
+    async def _count(
+        self,
+        db: AsyncSession,
+        query: Select,
+        count_mode: str,
+        filters: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        Counts the rows matched by `query` as precisely as `count_mode` asks for.
+        Returns the total together with the mode that actually produced it.
+        """
+        if count_mode == "none":
+            return {"total": None, "count_mode": "none"}
+
+        if count_mode == "estimated":
+            plan = await explain(db, query)
+            return {"total": int(plan["Plan Rows"]), "count_mode": "estimated"}
+
+        cache_key = None
+        if count_mode == "cached":
+            version = await self.get_collection_version()
+            if version is not None:
+                digest = hashlib.sha1(json.dumps(filters, sort_keys=True).encode()).hexdigest()
+                cache_key = f"items:count:{version}:{digest}"
+                try:
+                    cached_total = await redis_client.get_value(cache_key)
+                except RedisError:
+                    logger.warning("Could not read cached item count %s", cache_key, exc_info=True)
+                    cache_key = cached_total = None
+                if cached_total is not None:
+                    return {"total": int(cached_total), "count_mode": "cached"}
+
         count_query = select(func.count()).select_from(query.subquery())
         total_result = await db.execute(count_query)
         total = total_result.scalar() or 0
+
+        if cache_key is None:
+            # Without Redis a "cached" count is simply an exact one
+            return {"total": total, "count_mode": "exact"}
+        try:
+            await redis_client.set_value(cache_key, str(total), expire=settings.ITEM_COUNT_CACHE_TTL_SECONDS)
+        except RedisError:
+            logger.warning("Could not cache item count %s", cache_key, exc_info=True)
+        return {"total": total, "count_mode": "cached"}
+
+    async def stream_live(
+        self,
+        db: AsyncSession,
+        *,
+        category: Optional[str] = None,
+        status: Optional[str] = None,
+        sort_by: str = "created_at",
+        order: str = "desc",
+        batch_size: int = 1000,
+    ) -> AsyncResult:
+        """
+        Opens a server-side cursor over the live items as plain rows (no ORM
+        objects), fetched `batch_size` at a time. The caller must close it.
+        """
+        query = self._ordered_query(self._filtered_query(category, status), sort_by, order)
+        query = query.with_only_columns(*self.model.__table__.c)
+        return await db.stream(query.execution_options(yield_per=batch_size))
+
+    async def get_multi_paginated(
+        self, 
+        db: AsyncSession, 
+        page: int = 1, 
+        limit: int = 10, 
+        category: Optional[str] = None,
+        status: Optional[str] = None,
+        sort_by: str = "created_at",
+        order: str = "desc",
+        cursor: Optional[str] = None,
+        count_mode: str = "exact",
+        columns: Optional[Sequence[str]] = None,
+        q: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Offset pagination by default; when a cursor is given the page is fetched
+        with a keyset predicate on (sort column, id) instead, so its cost does not
+        depend on how deep the client has scrolled.
+
+        With `q` the items are name matches ranked by relevance (sort_by/order
+        are ignored) and only offset pages are available.
+
+        Items are plain rows of `columns` (default: all), never ORM objects.
+        """
+        if q and cursor:
+            raise InvalidCursorError("Cursors cannot be combined with q")
+        position = self._decode_position(cursor, sort_by, order) if cursor else None
+        query = self._filtered_query(category=category, status=status, q=q)
+
+        # Count total items
+        count = await self._count(
+            db, query, count_mode, filters={"category": category, "status": status, "q": q}
+        )
+        total = count["total"]
         
-        # Sorting
-        sort_column = getattr(self.model, sort_by, self.model.created_at)
-        if order == "asc":
-            query = query.order_by(sort_column.asc())
+        if q:
+            query = self._ranked_query(query, q)
         else:
-            query = query.order_by(sort_column.desc())
-            
-        # Pagination
-        query = query.offset(skip).limit(limit)
+            query = self._ordered_query(query, sort_by=sort_by, order=order, position=position)
+        backwards = position is not None and position["direction"] == "prev"
+
+        # id and the sort column are always fetched: the cursors are built from them
+        table = self.model.__table__
+        names = dict.fromkeys([*(columns or table.c.keys()), "id", self._sort_column(sort_by).key])
+        query = query.with_only_columns(*(table.c[name] for name in names))
+
+        # Pagination (one extra row tells us whether another page exists)
+        if position is None:
+            query = query.offset((page - 1) * limit)
+        query = query.limit(limit + 1)
         
         result = await db.execute(query)
-        items = result.scalars().all()
+        items = list(result.all())
+        has_more = len(items) > limit
+        items = items[:limit]
+        if backwards:
+            items.reverse()
+
+        if backwards:
+            has_next, has_prev = True, has_more
+        else:
+            has_next, has_prev = has_more, position is not None or page > 1
+
+        # Relevance order has no keyset to resume from, so search pages get no cursors
+        next_cursor = prev_cursor = None
+        if items and has_next and not q:
+            next_cursor = self._encode_position(items[-1], sort_by, order, "next")
+        if items and has_prev and not q:
+            prev_cursor = self._encode_position(items[0], sort_by, order, "prev")
         
         return {
             "items": items,
             "total": total,
-            "page": page,
+            "page": page if position is None else None,
             "size": limit,
-            "pages": (total + limit - 1) // limit if limit > 0 else 0
+            "pages": (total + limit - 1) // limit if total is not None and limit > 0 else None,
+            "count_mode": count["count_mode"],
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
         }
 
+    async def adjust_category_counts(self, db: AsyncSession, deltas: Dict[str, int]) -> None:
+        """
+        Applies live-count deltas per category inside the caller's transaction.
+        """
+        # Sorted so concurrent multi-category writers lock counter rows in the same order
+        rows = [{"category": c, "count": d} for c, d in sorted(deltas.items()) if d]
+        if not rows:
+            return
+        stmt = pg_insert(ItemCategoryCount).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ItemCategoryCount.category],
+            set_={"count": ItemCategoryCount.count + stmt.excluded.count},
+        )
+        await db.execute(stmt)
+
+    async def create(self, db: AsyncSession, *, obj_in: ItemCreate) -> Item:
+        await self.adjust_category_counts(db, {obj_in.category: 1})
+        return await super().create(db, obj_in=obj_in)
+
+    async def create_many(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: List[ItemCreate],
+        skip_failed_rows: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Inserts items with chunked multi-row INSERT ... RETURNING in one transaction.
+
+        By default any failure rolls the whole batch back and is reported
+        against the first row of the chunk the database rejected. With
+        skip_failed_rows, each chunk runs in a savepoint and a failing chunk is
+        retried row by row, so only the offending rows are dropped and reported
+        by their position.
+        """
+        stmt = insert(self.model).returning(self.model, sort_by_parameter_order=True)
+        chunk_size = settings.ITEM_BULK_CHUNK_SIZE
+        created: List[Item] = []
+        errors: List[Dict[str, Any]] = []
+
+        for start in range(0, len(objs_in), chunk_size):
+            rows = [obj.model_dump() for obj in objs_in[start:start + chunk_size]]
+            if not skip_failed_rows:
+                try:
+                    result = await db.execute(stmt, rows)
+                except SQLAlchemyError as e:
+                    await db.rollback()
+                    message = str(getattr(e, "orig", None) or e)
+                    return {"created": [], "errors": [{
+                        "index": start,
+                        "message": f"Rows {start}-{start + len(rows) - 1} were rejected by the database: {message}",
+                    }]}
+                created.extend(result.scalars().all())
+                continue
+
+            try:
+                async with db.begin_nested():
+                    result = await db.execute(stmt, rows)
+                created.extend(result.scalars().all())
+            except SQLAlchemyError:
+                for offset, row in enumerate(rows):
+                    try:
+                        async with db.begin_nested():
+                            result = await db.execute(stmt, [row])
+                        created.extend(result.scalars().all())
+                    except SQLAlchemyError as e:
+                        errors.append({"index": start + offset, "message": str(getattr(e, "orig", None) or e)})
+
+        await self.adjust_category_counts(db, Counter(item.category for item in created))
+        await db.commit()
+        return {"created": created, "errors": errors}
+
+    async def copy_import(
+        self,
+        db: AsyncSession,
+        batches: AsyncIterator[List[Tuple[Any, ...]]],
+    ) -> Dict[str, int]:
+        """
+        Loads (id, name, category, status) records in bulk: COPY into a
+        temporary staging table, then a single INSERT ... SELECT merges them
+        into items (ids that already exist are skipped) and bumps the category
+        counters. Commits.
+        """
+        staging = Table(
+            f"item_import_{uuid.uuid4().hex}",
+            MetaData(),
+            Column("id", PG_UUID(as_uuid=True)),
+            Column("name", String),
+            Column("category", String),
+            Column("status", String),
+            prefixes=["TEMPORARY"],
+            postgresql_on_commit="DROP",
+        )
+        connection = await db.connection()
+        await connection.run_sync(staging.create)
+
+        # COPY is only exposed by asyncpg itself; the raw connection is the one
+        # the session uses, so the rows land in the same transaction
+        driver = (await connection.get_raw_connection()).driver_connection
+        staged = 0
+        async for records in batches:
+            await driver.copy_records_to_table(staging.name, records=records, columns=IMPORT_COLUMNS)
+            staged += len(records)
+
+        inserted = (
+            pg_insert(self.model)
+            .from_select(IMPORT_COLUMNS, select(staging))
+            .on_conflict_do_nothing(index_elements=[self.model.id])
+            .returning(self.model.category)
+            .cte("inserted")
+        )
+        per_category = (
+            select(inserted.c.category, func.count())
+            .group_by(inserted.c.category)
+            # Same lock order as adjust_category_counts
+            .order_by(inserted.c.category)
+        )
+        counters = pg_insert(ItemCategoryCount).from_select(["category", "count"], per_category)
+        counters = counters.on_conflict_do_update(
+            index_elements=[ItemCategoryCount.category],
+            set_={"count": ItemCategoryCount.count + counters.excluded.count},
+        ).returning(ItemCategoryCount.category).cte("counters")
+
+        imported = await db.scalar(select(func.count()).select_from(inserted).add_cte(counters))
+        await db.commit()
+        return {"staged": staged, "imported": imported}
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: Item,
+        obj_in: Union[ItemUpdate, Dict[str, Any]]
+    ) -> Item:
+        update_data = obj_in if isinstance(obj_in, dict) else obj_in.model_dump(exclude_unset=True)
+        values = {field: value for field, value in update_data.items() if hasattr(self.model, field)}
+        if not values:
+            return db_obj
+
+        # As in update_many: the category being replaced is read under the row
+        # lock taken by the UPDATE itself, not from db_obj (loaded unlocked, maybe
+        # stale), and the counters are only locked after the item row
+        table = self.model.__table__
+        target = (
+            select(table.c.id, table.c.category.label("old_category"))
+            .where(table.c.id == db_obj.id)
+            .with_for_update()
+            .subquery()
+        )
+        result = await db.execute(
+            update(self.model)
+            .where(self.model.id == target.c.id)
+            .values(**values)
+            .returning(self.model, target.c.old_category)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        row = result.first()
+        if row is None:
+            return db_obj
+        item, old_category = row
+        if item.deleted_at is None and item.category != old_category:
+            await self.adjust_category_counts(db, {old_category: -1, item.category: 1})
+        await db.commit()
+        return item
+
+    def _selection(
+        self,
+        ids: Optional[List[UUID]] = None,
+        category: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> List[Any]:
+        conditions = [self.model.deleted_at.is_(None)]
+        if ids is not None:
+            conditions.append(self.model.id.in_(ids))
+        if category is not None:
+            conditions.append(self.model.category == category)
+        if status is not None:
+            conditions.append(self.model.status == status)
+        return conditions
+
+    async def _update_selection(
+        self,
+        db: AsyncSession,
+        values: Dict[str, Any],
+        returning: List[Any],
+        ids: Optional[List[UUID]] = None,
+        category: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> List[Row]:
+        """
+        Applies `values` to the live items matching the selection with a single
+        UPDATE ... RETURNING, which locks them and reads their current category
+        (as old_category) in the same statement, so category moves can be
+        applied to the counters exactly.
+
+        A filter-only selection is cut off one row past ITEM_BULK_MAX_SIZE and
+        the UPDATE only applies while it fits, so an oversized one writes
+        nothing and raises BulkSelectionTooLargeError.
+        """
+        table = self.model.__table__
+        selection = self._selection(ids, category, status)
+        targets = select(table.c.id, table.c.category.label("old_category")).where(*selection).with_for_update()
+        if ids is not None:
+            guard = []
+            targets = targets.cte("targets")
+        else:
+            targets = targets.limit(settings.ITEM_BULK_MAX_SIZE + 1).cte("targets")
+            guard = [select(func.count()).select_from(targets).scalar_subquery() <= settings.ITEM_BULK_MAX_SIZE]
+        stmt = (
+            update(table)
+            .where(table.c.id == targets.c.id, *guard)
+            .values(**values)
+            .returning(*returning, targets.c.old_category)
+        )
+        rows = (await db.execute(stmt)).all()
+
+        if not rows and guard:
+            # Nothing matched, or too much did: only the second is an error
+            limited = select(table.c.id).where(*selection).limit(settings.ITEM_BULK_MAX_SIZE + 1).subquery()
+            if await db.scalar(select(func.count()).select_from(limited)) > settings.ITEM_BULK_MAX_SIZE:
+                raise BulkSelectionTooLargeError(
+                    f"The selection matches more than {settings.ITEM_BULK_MAX_SIZE} items; "
+                    "narrow it down or pass ids"
+                )
+        return rows
+
+    async def update_many(
+        self,
+        db: AsyncSession,
+        *,
+        update_data: Dict[str, Any],
+        ids: Optional[List[UUID]] = None,
+        category: Optional[str] = None,
+        status: Optional[str] = None,
+        return_rows: bool = False,
+        max_ids: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Applies `update_data` to every live item matching the selection with a
+        single UPDATE ... RETURNING. Nothing is written when the selection is
+        larger than ITEM_BULK_MAX_SIZE.
+        """
+        table = self.model.__table__
+        returning = list(table.c) if return_rows else [table.c.id, table.c.category]
+        rows = await self._update_selection(db, update_data, returning, ids, category, status)
+
+        deltas = Counter()
+        for row in rows:
+            if row.category != row.old_category:
+                deltas[row.old_category] -= 1
+                deltas[row.category] += 1
+        await self.adjust_category_counts(db, deltas)
+        await db.commit()
+        return self._bulk_result(rows, return_rows, max_ids)
+
+    async def delete_many(
+        self,
+        db: AsyncSession,
+        *,
+        ids: Optional[List[UUID]] = None,
+        category: Optional[str] = None,
+        status: Optional[str] = None,
+        return_rows: bool = False,
+        max_ids: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Soft-deletes every live item matching the selection with a single
+        UPDATE ... RETURNING. Nothing is written when the selection is larger
+        than ITEM_BULK_MAX_SIZE.
+        """
+        table = self.model.__table__
+        returning = list(table.c) if return_rows else [table.c.id, table.c.category]
+        rows = await self._update_selection(
+            db, {"deleted_at": func.now(), "status": ItemStatus.INACTIVE}, returning, ids, category, status
+        )
+
+        deltas = Counter()
+        for row in rows:
+            deltas[row.category] -= 1
+        await self.adjust_category_counts(db, deltas)
+        await db.commit()
+        return self._bulk_result(rows, return_rows, max_ids)
+
+    def _bulk_result(self, rows: List[Any], return_rows: bool, max_ids: Optional[int] = None) -> Dict[str, Any]:
+        """
+        `ids` lists the affected items, or is None when there are `max_ids` or
+        more of them and the caller has said it would not use them.
+        """
+        items = None
+        if return_rows:
+            columns = self.model.__table__.c.keys()
+            items = [{column: row._mapping[column] for column in columns} for row in rows]
+        ids = None
+        if max_ids is None or len(rows) < max_ids:
+            ids = [row.id for row in rows]
+        return {"affected": len(rows), "ids": ids, "items": items}
+
     # Override delete for Soft Delete
     async def delete(self, db: AsyncSession, *, db_obj: Item) -> Item:
-        db_obj.deleted_at = datetime.utcnow()
-        db_obj.status = ItemStatus.INACTIVE
-        db.add(db_obj)
+        # Only a live row is updated, so a concurrent second delete finds
+        # nothing and cannot decrement the category counter twice
+        result = await db.execute(
+            update(self.model)
+            .where(self.model.id == db_obj.id, self.model.deleted_at.is_(None))
+            .values(deleted_at=func.now(), status=ItemStatus.INACTIVE)
+            .returning(self.model)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        deleted = result.scalars().first()
+        if deleted is None:
+            return db_obj
+        await self.adjust_category_counts(db, {deleted.category: -1})
         await db.commit()
-        await db.refresh(db_obj)
-        return db_obj
+        return deleted
 
     async def get_analytics(self, db: AsyncSession) -> Dict[str, Any]:
         """
         Calculates category density statistics with Caching.
         """
-        # 1. Check Cache
-        import json
-        from app.core.redis import redis_client
-        
-        cache_key = "analytics:category_density"
-        cached_data = await redis_client.get_value(cache_key)
-        if cached_data:
-            return json.loads(cached_data)
-
-        # 2. Calculate if cache miss
-        # Get total non-deleted items count
-        total_query = select(func.count(Item.id)).where(Item.deleted_at.is_(None))
-        total_result = await db.execute(total_query)
-        total_items = total_result.scalar() or 0
-        
-        result_data = {}
-
-        if total_items == 0:
-            result_data = {
-                "success": True,
-                "data": {
-                    "total_items": 0,
-                    "categories": []
-                }
-            }
-        else:
-            # Get count per category
-            cat_query = (
-                select(Item.category, func.count(Item.id))
-                .where(Item.deleted_at.is_(None))
-                .group_by(Item.category)
-            )
-            cat_result = await db.execute(cat_query)
-            
-            categories_data = []
-            for category, count in cat_result:
-                categories_data.append({
-                    "category": category,
-                    "count": count,
-                    "percentage": round((count / total_items) * 100, 1)
-                })
-                
-            result_data = {
-                "success": True,
-                "data": {
-                    "total_items": total_items,
-                    "categories": categories_data
-                }
+        async def refresh() -> Dict[str, Any]:
+            # Background refreshes outlive the request, so they need their own session
+            async with read_session_factory()() as session:
+                return await self._compute_analytics(session)
+
+        return await computation_cache.get_or_compute(
+            "analytics:category_density",
+            lambda: self._compute_analytics(db),
+            soft_ttl=settings.ANALYTICS_CACHE_SOFT_TTL_SECONDS,
+            hard_ttl=settings.ANALYTICS_CACHE_HARD_TTL_SECONDS,
+            refresh=refresh,
+        )
+
+    async def _compute_analytics(self, db: AsyncSession) -> Dict[str, Any]:
+        # The counter table has one row per category, so this stays O(#categories)
+        cat_query = (
+            select(ItemCategoryCount.category, ItemCategoryCount.count)
+            .where(ItemCategoryCount.count > 0)
+            .order_by(ItemCategoryCount.category)
+        )
+        cat_result = await db.execute(cat_query)
+        counts = cat_result.all()
+        total_items = sum(count for _, count in counts)
+
+        categories_data = []
+        for category, count in counts:
+            categories_data.append({
+                "category": category,
+                "count": count,
+                "percentage": round((count / total_items) * 100, 1)
+            })
+
+        return {
+            "success": True,
+            "data": {
+                "total_items": total_items,
+                "categories": categories_data
             }
-            
-        # 3. Set Cache (60 seconds)
-        await redis_client.set_value(cache_key, json.dumps(result_data), expire=60)
-        
-        return result_data
+        }
+
+    async def reconcile_category_counts(self, db: AsyncSession, *, dry_run: bool = False) -> List[Dict[str, Any]]:
+        """
+        Recomputes the live count of every category from items and rewrites the
+        counter table to match. Returns the categories whose counter had drifted.
+        """
+        # Writers touch the counters in the same transaction as items, so holding
+        # this lock means every committed write is visible and no new one can land.
+        await db.execute(text("LOCK TABLE item_category_counts IN EXCLUSIVE MODE"))
+
+        actual_result = await db.execute(
+            select(Item.category, func.count(Item.id))
+            .where(Item.deleted_at.is_(None))
+            .group_by(Item.category)
+        )
+        actual = dict(actual_result.all())
+        stored_result = await db.execute(select(ItemCategoryCount.category, ItemCategoryCount.count))
+        stored = dict(stored_result.all())
+
+        drift = [
+            {"category": category, "stored": stored.get(category, 0), "actual": actual.get(category, 0)}
+            for category in sorted(set(actual) | set(stored))
+            if stored.get(category, 0) != actual.get(category, 0)
+        ]
+
+        if drift and not dry_run:
+            await db.execute(delete(ItemCategoryCount))
+            if actual:
+                await db.execute(
+                    insert(ItemCategoryCount),
+                    [{"category": category, "count": count} for category, count in actual.items()],
+                )
+        await db.commit()
+        return drift
 
 item_repository = ItemRepository(Item)
@@ -1,5 +1,6 @@
-from typing import Optional
+from typing import Any, Dict, Optional
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
@@ -11,4 +12,19 @@ class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
         result = await db.execute(query)
         return result.scalars().first()
 
+    async def create_if_email_free(self, db: AsyncSession, *, obj_in: Dict[str, Any]) -> Optional[User]:
+        """
+        Inserts the user unless the email is taken, in one statement.
+        Returns None on conflict; the unique index makes this race-free.
+        """
+        result = await db.execute(
+            pg_insert(self.model)
+            .values(**obj_in)
+            .on_conflict_do_nothing(index_elements=[self.model.email])
+            .returning(self.model)
+        )
+        user = result.scalars().first()
+        await db.commit()
+        return user
+
 user_repository = UserRepository(User)
@@ -8,6 +8,9 @@ class Token(BaseModel):
 
 class TokenPayload(BaseModel):
     sub: Optional[str] = None
+    exp: Optional[int] = None
+    jti: Optional[str] = None  # Missing on tokens issued before revocation by jti
+    type: Optional[str] = None  # "refresh" for refresh tokens
 
 class RefreshTokenRequest(BaseModel):
     refresh_token: str
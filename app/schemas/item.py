@@ -1,6 +1,7 @@
-from typing import Optional, List
-from pydantic import BaseModel, UUID4
+from typing import Any, Dict, Optional, List, Literal
+from pydantic import BaseModel, Field, UUID4, field_validator, model_validator
 from datetime import datetime
+from app.core.config import settings
 from app.models.item import ItemStatus
 
 # Shared properties
@@ -11,7 +12,13 @@ class ItemBase(BaseModel):
 
 # Properties to receive on creation
 class ItemCreate(ItemBase):
-    pass
+    # Omitted means the default; an explicit null would hit the NOT NULL column
+    @field_validator("status")
+    @classmethod
+    def check_status_not_null(cls, value):
+        if value is None:
+            raise ValueError("status cannot be null")
+        return value
 
 # Properties to receive on update
 class ItemUpdate(BaseModel):
@@ -29,9 +36,83 @@ class ItemResponse(ItemBase):
     class Config:
         from_attributes = True
 
+# Names accepted by the `fields` query parameter (sparse fieldsets)
+ITEM_FIELDS = tuple(ItemResponse.model_fields)
+
 class PaginatedItemResponse(BaseModel):
     items: List[ItemResponse]
-    total: int
-    page: int
+    total: Optional[int]  # None when count_mode is "none"
+    page: Optional[int]  # None when the page was fetched by cursor
     size: int
-    pages: int
+    pages: Optional[int]
+    count_mode: str  # How total/pages were obtained: exact, estimated, cached or none
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+# Bulk creation: rows are validated one by one so that "partial" mode can
+# report bad rows instead of rejecting the whole request
+class ItemBulkCreate(BaseModel):
+    items: List[Dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.ITEM_BULK_MAX_SIZE,
+        description="Objects with the ItemCreate fields",
+    )
+    # atomic: any invalid row rejects the whole batch; partial: valid rows are created
+    mode: Literal["atomic", "partial"] = "atomic"
+
+class ItemBulkError(BaseModel):
+    index: int  # Position in the request's items list
+    message: str
+
+class ItemBulkCreateResponse(BaseModel):
+    created: List[ItemResponse]
+    errors: List[ItemBulkError]
+
+# Bulk update / soft delete: targets are given by id, by filter, or both (ANDed)
+class ItemBulkSelector(BaseModel):
+    ids: Optional[List[UUID4]] = Field(None, min_length=1, max_length=settings.ITEM_BULK_MAX_SIZE)
+    category: Optional[str] = None
+    status: Optional[ItemStatus] = None
+    return_rows: bool = False
+
+    @model_validator(mode="after")
+    def check_has_selector(self):
+        if self.ids is None and self.category is None and self.status is None:
+            raise ValueError("At least one of ids, category or status is required")
+        return self
+
+class ItemBulkUpdate(ItemBulkSelector):
+    update: ItemUpdate
+
+    @model_validator(mode="after")
+    def check_has_changes(self):
+        changes = self.update.model_dump(exclude_unset=True)
+        if not changes:
+            raise ValueError("update must set at least one field")
+        # None is only the "not given" default; the columns themselves are NOT NULL
+        nulls = [field for field, value in changes.items() if value is None]
+        if nulls:
+            raise ValueError(f"update fields cannot be null: {', '.join(nulls)}")
+        return self
+
+class ItemBulkDelete(ItemBulkSelector):
+    pass
+
+class ItemBulkResult(BaseModel):
+    affected: int
+    items: Optional[List[ItemResponse]] = None  # Only when return_rows is set
+
+# File import (COPY): rows are reported by their 1-based position in the file's data
+class ItemImportError(BaseModel):
+    row: int
+    message: str
+
+class ItemImportReport(BaseModel):
+    received: int  # Data rows read from the file
+    imported: int
+    duplicates: int  # Valid rows whose id already existed, left untouched
+    rejected: int
+    errors: List[ItemImportError]  # The first ITEM_IMPORT_MAX_REPORTED_ERRORS rejections
+    seconds: float
+    rows_per_second: float
@@ -1,12 +1,159 @@
-from typing import List, Optional, Dict, Any
-from uuid import UUID
+import asyncio
+import codecs
+import csv
+import io
+import itertools
+import json
+import time
+from typing import AsyncIterator, BinaryIO, Callable, Iterable, Iterator, List, Optional, Dict, Any, Sequence, Set, Tuple
+from uuid import UUID, uuid4
+from datetime import datetime
+import anyio
+from pydantic import ValidationError
+from pydantic_core import to_jsonable_python
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.item import Item
-from app.schemas.item import ItemCreate, ItemUpdate
+from app.core.cache import TaggedCache
+from app.core.config import settings
+from app.core.database import read_engines
+from app.core.logging import logger
+from app.core.metrics import register_cache
+from app.models.item import Item, ItemStatus
+from app.schemas.item import ITEM_FIELDS, ItemBulkDelete, ItemBulkUpdate, ItemCreate, ItemUpdate
 from app.repositories.item_repository import item_repository
 
+item_cache = TaggedCache(
+    "items",
+    ttl=settings.ITEM_CACHE_TTL_SECONDS,
+    max_bytes=settings.ITEM_CACHE_MAX_BYTES,
+    enabled=settings.ITEM_CACHE_ENABLED,
+    max_tags=settings.ITEM_CACHE_MAX_INVALIDATION_TAGS,
+)
+register_cache("item", lambda: (item_cache.hits, item_cache.misses))
+
+def _item_tag(id: Any) -> str:
+    return f"item:{id}"
+
+def _items_to_dicts(items: Iterable[Any], fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """
+    JSON-ready representation of items (ORM objects or rows), as cached and
+    returned by reads. pydantic-core converts UUIDs, datetimes and enums in
+    one pass, formatting them exactly as ItemResponse would.
+    """
+    fields = fields or ITEM_FIELDS
+    return to_jsonable_python([{field: getattr(item, field) for field in fields} for item in items])
+
+EXPORT_COLUMNS = ("id", "name", "category", "status", "created_at", "updated_at")
+
+def _export_values(row: Any) -> List[Any]:
+    mapping = row._mapping
+    values = []
+    for column in EXPORT_COLUMNS:
+        value = mapping[column]
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, UUID):
+            value = str(value)
+        values.append(value)
+    return values
+
+def _csv_chunk(rows: Iterable[Iterable[Any]]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+def _validation_message(error: ValueError) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors()
+        )
+    return str(error)
+
+def _read_import_rows(stream: BinaryIO, format: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Yields (row number, parsed row) pairs from an uploaded CSV or NDJSON file.
+    NDJSON lines that are not valid JSON come through as the parse error.
+    """
+    lines = codecs.getreader("utf-8-sig")(stream)
+    if format == "csv":
+        for number, row in enumerate(csv.DictReader(lines), start=1):
+            # Empty cells mean "not given", so optional columns get their defaults
+            yield number, {k: v for k, v in row.items() if k is not None and v not in ("", None)}
+        return
+
+    number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            yield number, json.loads(line)
+        except ValueError as e:
+            yield number, e
+
+def _next_import_batch(rows: Iterator[Tuple[int, Any]], size: int) -> Tuple[List[Tuple[Any, ...]], List[Dict[str, Any]], bool]:
+    """
+    Validates up to `size` rows into COPY records (in IMPORT_COLUMNS order).
+    Returns the records, the rejected rows and whether the file is exhausted.
+    """
+    records, rejected = [], []
+    for number, data in itertools.islice(rows, size):
+        try:
+            if isinstance(data, Exception):
+                raise data
+            if not isinstance(data, dict):
+                raise ValueError("Expected an object")
+            item = ItemCreate.model_validate(data)
+            item_id = uuid4()
+            if data.get("id"):
+                try:
+                    item_id = UUID(str(data["id"]))
+                except ValueError:
+                    raise ValueError("id: Input should be a valid UUID")
+        except ValueError as e:
+            rejected.append({"row": number, "message": _validation_message(e)})
+            continue
+        records.append((item_id, item.name, item.category, (item.status or ItemStatus.ACTIVE).value))
+    return records, rejected, len(records) + len(rejected) < size
+
+_delayed_invalidations: Set[asyncio.Task] = set()
+
+async def _invalidate(ids: Optional[Iterable[Any]] = (), delayed: bool = False) -> None:
+    """
+    Called once per write (or batch), after its commit: moves the list
+    ETag/count version on, which retires every cached list page at once
+    (they are keyed by it and expire with their TTL), and drops the cached
+    reads of the written items. Large writes (or `ids=None`, when they were
+    not collected) drop the whole item cache in one command rather than item
+    by item. Redis errors are logged, never raised: the write itself has
+    succeeded.
+    """
+    ids = None if ids is None else list(ids)
+    try:
+        await item_repository.bump_collection_version()
+    except RedisError:
+        logger.warning("Could not move the item collection version on", exc_info=True)
+    if ids is None or len(ids) >= item_cache.max_tags:
+        await item_cache.invalidate_all()
+    else:
+        await item_cache.invalidate_tags(*(_item_tag(id) for id in ids))
+    if read_engines and not delayed:
+        # A lagging replica can hand the old rows to a reader who caches them
+        # (and their ETag) again; repeat once the replicas have caught up.
+        task = asyncio.create_task(_invalidate_after_lag(ids))
+        _delayed_invalidations.add(task)
+        task.add_done_callback(_delayed_invalidations.discard)
+
+async def _invalidate_after_lag(ids: Optional[List[Any]]) -> None:
+    await asyncio.sleep(settings.DATABASE_READ_LAG_SECONDS)
+    try:
+        await _invalidate(ids, delayed=True)
+    except Exception:
+        logger.exception("Delayed item cache invalidation failed")
+
 class ItemService:
     @staticmethod
+    @item_cache.cached("get_multi", tags=lambda result, **_: [])
     async def get_multi(
         db: AsyncSession, 
         page: int = 1, 
@@ -14,11 +161,41 @@ class ItemService:
         category: Optional[str] = None,
         status: Optional[str] = None,
         sort_by: str = "created_at",
-        order: str = "desc"
+        order: str = "desc",
+        cursor: Optional[str] = None,
+        count_mode: str = "exact",
+        fields: Optional[List[str]] = None,
+        q: Optional[str] = None,
+        version: Optional[str] = None,
     ) -> Dict[str, Any]:
-        return await item_repository.get_multi_paginated(
-            db, page=page, limit=limit, category=category, status=status, sort_by=sort_by, order=order
+        """
+        Cached; items come back as JSON-ready dicts (see `_items_to_dicts`)
+        holding only `fields` when given.
+
+        `version` is the collection version read before the call and is part
+        of the cache key only: a page computed before a write but stored after
+        it lands under the old version, where nobody looks it up any more.
+        """
+        result = await item_repository.get_multi_paginated(
+            db, page=page, limit=limit, category=category, status=status, sort_by=sort_by, order=order,
+            cursor=cursor, count_mode=count_mode, columns=fields, q=q,
         )
+        result["items"] = _items_to_dicts(result["items"], fields)
+        return result
+
+    @staticmethod
+    @item_cache.cached("read", tags=lambda result, id, fields: [_item_tag(id)])
+    async def read(db: AsyncSession, id: UUID, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Cached read of a live item: {"item": JSON-ready dict of `fields` (default
+        all), "updated_at": its version for ETags}. Use `get` when the ORM object
+        is needed (e.g. to update it).
+        """
+        columns = list(dict.fromkeys([*(fields or ITEM_FIELDS), "updated_at"]))
+        row = await item_repository.get_live_row(db, id, columns)
+        if row is None:
+            return None
+        return {"item": _items_to_dicts([row], fields)[0], "updated_at": to_jsonable_python(row.updated_at)}
 
     @staticmethod
     async def get(db: AsyncSession, id: UUID) -> Optional[Item]:
@@ -27,17 +204,171 @@ class ItemService:
             return None
         return item
 
+    @staticmethod
+    async def get_collection_version() -> Optional[str]:
+        return await item_repository.get_collection_version()
+
     @staticmethod
     async def create(db: AsyncSession, item_in: ItemCreate) -> Item:
-        return await item_repository.create(db, obj_in=item_in)
+        item = await item_repository.create(db, obj_in=item_in)
+        await _invalidate()
+        return item
+
+    @staticmethod
+    async def create_many(db: AsyncSession, rows: List[Dict[str, Any]], mode: str = "atomic") -> Dict[str, Any]:
+        """
+        Validates and inserts a batch of items. In "atomic" mode nothing is
+        created if any row is invalid; in "partial" mode bad rows are skipped.
+        Either way every rejected row is listed in "errors" by its index, except
+        that an atomic batch the database rejects is reported once, against the
+        first row of the failing chunk.
+        """
+        items_in: List[ItemCreate] = []
+        errors: List[Dict[str, Any]] = []
+        positions: List[int] = []
+        for index, row in enumerate(rows):
+            try:
+                items_in.append(ItemCreate.model_validate(row))
+                positions.append(index)
+            except ValidationError as e:
+                errors.append({"index": index, "message": _validation_message(e)})
+
+        if errors and mode == "atomic":
+            return {"created": [], "errors": errors}
+
+        result = await item_repository.create_many(
+            db, objs_in=items_in, skip_failed_rows=(mode == "partial")
+        )
+        # Repository indexes refer to the validated subset; map them back
+        for error in result["errors"]:
+            errors.append({"index": positions[error["index"]], "message": error["message"]})
+        if result["created"]:
+            await _invalidate()
+        return {"created": result["created"], "errors": sorted(errors, key=lambda e: e["index"])}
+
+    @staticmethod
+    async def import_items(db: AsyncSession, stream: BinaryIO, format: str = "csv") -> Dict[str, Any]:
+        """
+        Imports a CSV (with a header row) or NDJSON file of ItemCreate rows,
+        optionally carrying an `id`. Valid rows are COPYed in and merged in one
+        statement; invalid ones are counted and reported, never fatal.
+        """
+        started = time.perf_counter()
+        rows = _read_import_rows(stream, format)
+        received = rejected = 0
+        errors: List[Dict[str, Any]] = []
+
+        async def batches():
+            nonlocal received, rejected
+            while True:
+                # Reading and validating is blocking, CPU-heavy work: keep it off the event loop
+                records, bad, done = await anyio.to_thread.run_sync(
+                    _next_import_batch, rows, settings.ITEM_IMPORT_BATCH_SIZE
+                )
+                received += len(records) + len(bad)
+                rejected += len(bad)
+                errors.extend(bad[:max(settings.ITEM_IMPORT_MAX_REPORTED_ERRORS - len(errors), 0)])
+                if records:
+                    yield records
+                if done:
+                    return
+
+        result = await item_repository.copy_import(db, batches())
+        if result["imported"]:
+            await _invalidate()
+
+        seconds = time.perf_counter() - started
+        return {
+            "received": received,
+            "imported": result["imported"],
+            "duplicates": result["staged"] - result["imported"],
+            "rejected": rejected,
+            "errors": errors,
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(received / seconds, 1) if seconds else 0.0,
+        }
+
+    @staticmethod
+    async def update_many(db: AsyncSession, bulk_in: ItemBulkUpdate) -> Dict[str, Any]:
+        result = await item_repository.update_many(
+            db,
+            update_data=bulk_in.update.model_dump(exclude_unset=True),
+            ids=bulk_in.ids,
+            category=bulk_in.category,
+            status=bulk_in.status,
+            return_rows=bulk_in.return_rows,
+            # Above this many the whole item cache is dropped, so no ids are needed
+            max_ids=item_cache.max_tags,
+        )
+        # One invalidation for the whole batch
+        if result["affected"]:
+            await _invalidate(result["ids"])
+        return result
+
+    @staticmethod
+    async def delete_many(db: AsyncSession, bulk_in: ItemBulkDelete) -> Dict[str, Any]:
+        result = await item_repository.delete_many(
+            db,
+            ids=bulk_in.ids,
+            category=bulk_in.category,
+            status=bulk_in.status,
+            return_rows=bulk_in.return_rows,
+            max_ids=item_cache.max_tags,
+        )
+        if result["affected"]:
+            await _invalidate(result["ids"])
+        return result
 
     @staticmethod
     async def update(db: AsyncSession, db_item: Item, item_in: ItemUpdate) -> Item:
-        return await item_repository.update(db, db_obj=db_item, obj_in=item_in)
+        item = await item_repository.update(db, db_obj=db_item, obj_in=item_in)
+        await _invalidate([item.id])
+        return item
 
     @staticmethod
     async def delete(db: AsyncSession, db_item: Item) -> Item:
-        return await item_repository.delete(db, db_obj=db_item)
+        item = await item_repository.delete(db, db_obj=db_item)
+        await _invalidate([item.id])
+        return item
+
+    @staticmethod
+    async def export(
+        session_factory: Callable[[], AsyncSession],
+        *,
+        format: str = "ndjson",
+        category: Optional[str] = None,
+        status: Optional[str] = None,
+        sort_by: str = "created_at",
+        order: str = "desc",
+    ) -> AsyncIterator[str]:
+        """
+        Yields the matching live items as NDJSON lines or CSV, one chunk per
+        fetched batch, so memory does not grow with the table. Runs on a
+        session of its own since the request's session is closed before a
+        streamed body is sent.
+        """
+        db = session_factory()
+        result = None
+        try:
+            result = await item_repository.stream_live(
+                db, category=category, status=status, sort_by=sort_by, order=order,
+                batch_size=settings.ITEM_EXPORT_BATCH_SIZE,
+            )
+            if format == "csv":
+                yield _csv_chunk([EXPORT_COLUMNS])
+            async for rows in result.partitions():
+                values = [_export_values(row) for row in rows]
+                if format == "csv":
+                    yield _csv_chunk(values)
+                else:
+                    yield "".join(json.dumps(dict(zip(EXPORT_COLUMNS, v))) + "\n" for v in values)
+        finally:
+            # Also runs when the client disconnects and the response cancels
+            # us; shield the cleanup so the cursor really gets closed.
+            with anyio.CancelScope(shield=True):
+                if result is not None:
+                    await result.close()
+                await db.close()
 
     @staticmethod
     async def get_analytics(db: AsyncSession) -> Dict[str, Any]:
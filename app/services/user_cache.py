@@ -0,0 +1,195 @@
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import register_cache
+from app.core.redis import redis_client
+from app.models.user import User
+
+# Everything get_current_user and the profile endpoints read from the user.
+# password_hash is deliberately left out of both tiers.
+CACHED_FIELDS = ("id", "email", "first_name", "last_name", "is_active", "created_at")
+USER_INVALIDATION_CHANNEL = "users:invalidations"
+
+
+class UserCache:
+    """
+    Two-tier cache of the authenticated user: an in-process LRU with a short
+    TTL, backed by Redis, backed by the users table.
+
+    Every user has a generation counter in Redis, moved on by `invalidate`.
+    Entries carry the generation they were loaded under and only count while
+    it is still current, so a load that raced an invalidation is never
+    served. Invalidations are also published, and every worker drops its
+    local copy on receipt, the same way token revocations are spread.
+    """
+
+    def __init__(self):
+        self.local = TTLCache(
+            maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_LOCAL_TTL_SECONDS
+        )
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        # Moves on with every local drop; a lookup that saw it move skips the local fill
+        self._epoch = 0
+        self._listener: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _redis_key(user_id: Any) -> str:
+        return f"user:{user_id}"
+
+    @staticmethod
+    def _generation_key(user_id: Any) -> str:
+        return f"user:{user_id}:generation"
+
+    async def get(self, db: AsyncSession, user_id: str) -> Optional[User]:
+        fields = self.local.get(user_id)
+        if fields is not None:
+            self.local_hits += 1
+            return self._to_user(fields)
+
+        epoch = self._epoch
+        raw = generation = None
+        client = redis_client.redis_client
+        if client is not None:
+            try:
+                with redis_client.timed("MGET"):
+                    raw, generation = await client.mget(
+                        self._redis_key(user_id), self._generation_key(user_id)
+                    )
+            except RedisError:
+                logger.warning("User cache read of %s failed", user_id, exc_info=True)
+        entry = json.loads(raw) if raw is not None else None
+        # Entries written before generations existed hold the bare fields
+        if isinstance(entry, dict) and "fields" in entry and entry.get("g") == generation:
+            self.redis_hits += 1
+            fields = entry["fields"]
+            fields["id"] = UUID(fields["id"])
+            if fields["created_at"] is not None:
+                fields["created_at"] = datetime.fromisoformat(fields["created_at"])
+            if epoch == self._epoch:
+                self.local.set(user_id, fields)
+            return self._to_user(fields)
+
+        self.misses += 1
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalars().first()
+        if user is not None:
+            await self.set(user, generation=generation, epoch=epoch)
+        return user
+
+    async def set(self, user: User, generation: Optional[str] = None, epoch: Optional[int] = None) -> None:
+        """
+        Caches `user` as loaded under `generation` (and, locally, under `epoch`),
+        both read before the user was.
+        """
+        fields = {field: getattr(user, field) for field in CACHED_FIELDS}
+        if epoch is None or epoch == self._epoch:
+            self.local.set(str(user.id), fields)
+        client = redis_client.redis_client
+        if client is None:
+            return
+        try:
+            with redis_client.timed("SET"):
+                await client.set(
+                    self._redis_key(user.id),
+                    json.dumps({"g": generation, "fields": fields}, default=str),
+                    ex=settings.USER_CACHE_REDIS_TTL_SECONDS,
+                )
+        except RedisError:
+            logger.warning("User cache fill of %s failed", user.id, exc_info=True)
+
+    async def invalidate(self, user_id: Any) -> None:
+        self._forget(str(user_id))
+        client = redis_client.redis_client
+        if client is None:
+            return
+        generation_key = self._generation_key(user_id)
+        try:
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.incr(generation_key)
+                # Only needs to outlive the entries loaded under the old generation
+                pipe.expire(generation_key, 2 * settings.USER_CACHE_REDIS_TTL_SECONDS)
+                pipe.delete(self._redis_key(user_id))
+                pipe.publish(USER_INVALIDATION_CHANNEL, str(user_id))
+                with redis_client.timed("PIPELINE"):
+                    await pipe.execute()
+        except RedisError:
+            logger.warning("User cache invalidation of %s failed", user_id, exc_info=True)
+
+    def _forget(self, user_id: Optional[str] = None) -> None:
+        # None drops every local entry
+        self._epoch += 1
+        if user_id is None:
+            self.local.clear()
+        else:
+            self.local.pop(user_id)
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self) -> None:
+        while True:
+            client = redis_client.redis_client
+            if client is None:
+                await asyncio.sleep(1)
+                continue
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(USER_INVALIDATION_CHANNEL)
+                # Invalidations published while disconnected are lost; start over
+                self._forget()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._forget(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("User cache listener disconnected, resubscribing", exc_info=True)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.local_hits + self.redis_hits) / lookups, 4) if lookups else None,
+            "local_size": len(self.local),
+        }
+
+    @staticmethod
+    def _to_user(fields: Dict[str, Any]) -> User:
+        # A detached instance with its identity set: it can be returned as-is,
+        # or added to a session and updated without re-selecting the row.
+        # Columns that are not cached load lazily as expired attributes.
+        user = User(**fields)
+        make_transient_to_detached(user)
+        return user
+
+
+user_cache = UserCache()
+register_cache("user", lambda: (user_cache.local_hits + user_cache.redis_hits, user_cache.misses))
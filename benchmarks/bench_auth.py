@@ -0,0 +1,58 @@
+"""
+Auth dependency overhead with the verified-JWT cache on and off.
+
+    python -m benchmarks.bench_auth [--iterations N]
+
+Runs get_current_user against a warmed user cache, so the numbers cover token
+verification and the revocation check but no database or network I/O.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+
+from app.api import deps
+from app.core import security
+from app.core.config import settings
+from app.services.user_cache import user_cache
+
+
+async def _run(token: str, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await deps.get_current_user(db=None, token=token)
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    user_id = uuid.uuid4()
+    user_cache.local.set(str(user_id), {
+        "id": user_id,
+        "email": "bench@example.com",
+        "first_name": None,
+        "last_name": None,
+        "is_active": True,
+        "created_at": datetime.now(timezone.utc),
+    })
+    token = security.create_access_token(user_id)
+
+    results = {}
+    for enabled in (False, True):
+        settings.TOKEN_CACHE_ENABLED = enabled
+        asyncio.run(_run(token, 1000))  # warm-up
+        results[enabled] = asyncio.run(_run(token, args.iterations))
+
+    off, on = results[False], results[True]
+    print(f"iterations per run: {args.iterations}")
+    print(f"token cache off: {off * 1e6:8.1f} us/request")
+    print(f"token cache on:  {on * 1e6:8.1f} us/request")
+    print(f"speedup:         {off / on:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Per-call overhead of the metrics instrumentation.
+
+    python -m benchmarks.bench_metrics [--iterations N]
+
+Times a bare FastAPI route with and without MetricsMiddleware and
+ServerTimingMiddleware (driving the ASGI app directly, no server or HTTP
+client in between), the SQLAlchemy cursor-execute hooks around one statement
+and the RedisClient timing wrapper around a no-op client. No database or
+Redis involved.
+"""
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+
+from app.core.database import _observe_statement, _start_statement_timer
+from app.core.middleware import MetricsMiddleware, ServerTimingMiddleware
+from app.core.redis import RedisClient
+
+
+def _app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{id}")
+    async def read_item(id: str):
+        return {"id": id}
+
+    if instrumented:
+        app.add_middleware(ServerTimingMiddleware)
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def _request(app: FastAPI, iterations: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/items/42", "raw_path": b"/items/42", "root_path": "", "query_string": b"", "headers": [],
+        "client": ("127.0.0.1", 1234), "server": ("testserver", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / iterations
+
+
+def _statement_hooks(iterations: int) -> float:
+    context = SimpleNamespace()
+    statement = "SELECT items.id, items.name FROM items WHERE items.id = $1::UUID"
+    start = time.perf_counter()
+    for _ in range(iterations):
+        _start_statement_timer(None, None, statement, None, context, False)
+        _observe_statement(None, None, statement, None, context, False)
+    return (time.perf_counter() - start) / iterations
+
+
+class _NoopRedis:
+    async def get(self, key):
+        return None
+
+
+async def _redis_calls(client: RedisClient, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await client.get_value("key")
+    return (time.perf_counter() - start) / iterations
+
+
+async def _redis_baseline(noop: _NoopRedis, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await noop.get("key")
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    n = args.iterations
+
+    bare, instrumented = _app(False), _app(True)
+    for app in (bare, instrumented):
+        asyncio.run(_request(app, 1000))  # warm-up (also builds the middleware stack)
+    client = RedisClient()
+    client.redis_client = _NoopRedis()
+
+    # Alternate the variants and keep each one's best round to damp scheduler noise
+    request_bare = request_instrumented = redis_timed = redis_bare = float("inf")
+    for _ in range(args.rounds):
+        request_bare = min(request_bare, asyncio.run(_request(bare, n)))
+        request_instrumented = min(request_instrumented, asyncio.run(_request(instrumented, n)))
+        redis_timed = min(redis_timed, asyncio.run(_redis_calls(client, n)))
+        redis_bare = min(redis_bare, asyncio.run(_redis_baseline(client.redis_client, n)))
+
+    print(f"iterations per run: {n}, best of {args.rounds} rounds")
+    print(f"request, bare          {request_bare * 1e6:8.2f} us")
+    print(f"request, instrumented  {request_instrumented * 1e6:8.2f} us  "
+          f"(+{(request_instrumented - request_bare) * 1e6:.2f} us)")
+    statement_hooks = min(_statement_hooks(n) for _ in range(args.rounds))
+    print(f"SQL statement hooks    {statement_hooks * 1e6:8.2f} us per statement")
+    print(f"Redis timing wrapper   {(redis_timed - redis_bare) * 1e6:8.2f} us per command")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+CPU cost of turning one page of items into a JSON response body.
+
+    python -m benchmarks.bench_serialization [--iterations N] [--page-size N]
+
+Compares FastAPI's response_model path (validate against PaginatedItemResponse,
+jsonable_encoder, json.dumps), fed with ORM items as before and with the
+service's JSON-ready dicts, against the fast path the item endpoints use now.
+No database involved: the items are transient ORM instances.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.api.v1.endpoints.items import _json_response
+from app.models.item import Item, ItemStatus
+from app.schemas.item import PaginatedItemResponse
+from app.services.item_service import _items_to_dicts
+
+
+def _page(size: int) -> dict:
+    now = datetime.now(timezone.utc)
+    items = [
+        Item(
+            id=uuid.uuid4(),
+            name=f"Benchmark Item {i}",
+            category="Electronics",
+            status=ItemStatus.ACTIVE.value,
+            created_at=now - timedelta(minutes=i),
+            updated_at=now,
+            deleted_at=None,
+        )
+        for i in range(size)
+    ]
+    return {
+        "items": items, "total": 10000, "page": 1, "size": size, "pages": 10000 // size,
+        "count_mode": "exact", "next_cursor": "abc", "prev_cursor": None,
+    }
+
+
+async def _response_model(page: dict, field) -> bytes:
+    content = await serialize_response(field=field, response_content=page, is_coroutine=True)
+    return JSONResponse(content).body
+
+
+async def _dicts_response_model(page: dict, field) -> bytes:
+    return await _response_model({**page, "items": _items_to_dicts(page["items"])}, field)
+
+
+async def _fast_path(page: dict, field) -> bytes:
+    return _json_response({**page, "items": _items_to_dicts(page["items"])}).body
+
+
+async def _run(serialize, page: dict, field, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await serialize(page, field)
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    page = _page(args.page_size)
+    field = create_response_field(name="response", type_=PaginatedItemResponse)
+    paths = {
+        "response_model, ORM items": _response_model,
+        "response_model, dicts": _dicts_response_model,
+        "fast path": _fast_path,
+    }
+
+    results = {}
+    for label, serialize in paths.items():
+        asyncio.run(_run(serialize, page, field, 100))  # warm-up
+        results[label] = asyncio.run(_run(serialize, page, field, args.iterations))
+
+    baseline = results["response_model, ORM items"]
+    print(f"page size: {args.page_size}, iterations per run: {args.iterations}")
+    for label, seconds in results.items():
+        print(f"{label:27s} {seconds * 1e6:9.1f} us/page  ({baseline / seconds:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
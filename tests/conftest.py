@@ -6,6 +6,7 @@ Test Configuration with Database Isolation
 """
 import asyncio
 import uuid
+from contextlib import contextmanager
 from typing import AsyncGenerator
 
 import pytest
@@ -14,7 +15,8 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
-from app.core.database import Base, get_db
+from app.core.database import Base, get_db, get_read_db, get_read_session_factory
+from app.core.metrics import track_request
 from app.main import app
 
 
@@ -75,6 +77,10 @@ async def override_get_db(db_session):
         yield db_session
     
     app.dependency_overrides[get_db] = _get_db_override
+    # Reads would go to a replica, which cannot see the test's uncommitted rows
+    app.dependency_overrides[get_read_db] = _get_db_override
+    # Streamed responses open their own session; hand them the test one too
+    app.dependency_overrides[get_read_session_factory] = lambda: (lambda: db_session)
     yield
     app.dependency_overrides.clear()
 
@@ -116,3 +122,23 @@ async def ac() -> AsyncGenerator[AsyncClient, None]:
 def unique_email():
     """Generate a unique email for each test."""
     return f"test_{uuid.uuid4()}@example.com"
+
+
+# -------------------------------------------------
+# Helper: SQL statement budget
+# -------------------------------------------------
+@pytest.fixture
+def assert_max_queries():
+    """
+    Context manager failing the test when the requests made inside it run
+    more than `limit` SQL statements:
+
+        with assert_max_queries(2):
+            await ac.get("/api/v1/items/", headers=headers)
+    """
+    @contextmanager
+    def check(limit: int):
+        with track_request() as stats:
+            yield stats
+        assert stats.db_count <= limit, f"{stats.db_count} SQL statements, budget is {limit}"
+    return check
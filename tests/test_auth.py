@@ -15,3 +15,37 @@ def test_jwt_token_creation():
     payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
     assert payload["sub"] == user_id
     assert "exp" in payload
+
+def test_decode_token_cache_respects_exp():
+    from datetime import timedelta
+    from jose import JWTError
+    from app.core.security import decode_token, _token_cache
+
+    token = create_access_token(subject="cached_user", expires_delta=timedelta(seconds=-1))
+    # Already expired: must be rejected and never cached
+    with pytest.raises(JWTError):
+        decode_token(token)
+
+    token = create_access_token(subject="cached_user")
+    first = decode_token(token)
+    assert decode_token(token) is first
+    assert first.sub == "cached_user"
+    assert len(_token_cache) >= 1
+
+@pytest.mark.asyncio
+async def test_password_hashing_admission_control(monkeypatch):
+    import asyncio
+    from app.core.security import PasswordHasherBusy, get_password_hash_async, verify_password_async
+
+    hashed = await get_password_hash_async("secret_test_password")
+    assert await verify_password_async("secret_test_password", hashed)
+
+    # With room for a single pending call, a concurrent second one is turned away
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 1)
+    results = await asyncio.gather(
+        get_password_hash_async("first"),
+        get_password_hash_async("second"),
+        return_exceptions=True,
+    )
+    assert isinstance(results[1], PasswordHasherBusy)
+    assert verify_password("first", results[0])
@@ -0,0 +1,213 @@
+"""
+Computation Cache Tests
+Tests single-flight recomputation, stale-while-revalidate behaviour and
+tag-based invalidation of the read-through cache.
+"""
+import asyncio
+import uuid
+
+import pytest
+import redis.asyncio as redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.core.cache import ComputationCache, TaggedCache
+from app.core.redis import redis_client
+from app.repositories.item_repository import item_repository
+from app.schemas.item import ItemCreate, ItemUpdate
+from app.services.item_service import ItemService
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_compute_once():
+    cache = ComputationCache()
+    key = f"test:single_flight:{uuid.uuid4()}"
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"answer": 42}
+
+    results = await asyncio.gather(*[
+        cache.get_or_compute(key, compute, soft_ttl=60, hard_ttl=120) for _ in range(20)
+    ])
+
+    assert calls == 1
+    assert all(r == {"answer": 42} for r in results)
+
+
+@pytest.mark.asyncio
+async def test_stale_value_served_while_refreshing():
+    cache = ComputationCache()
+    key = f"test:swr:{uuid.uuid4()}"
+    version = 0
+
+    async def compute():
+        nonlocal version
+        version += 1
+        return version
+
+    # soft_ttl=0 makes the entry stale as soon as it is written
+    assert await cache.get_or_compute(key, compute, soft_ttl=0, hard_ttl=60) == 1
+    assert await cache.get_or_compute(key, compute, soft_ttl=0, hard_ttl=60) == 1
+
+    await asyncio.gather(*cache._refresh_tasks)
+    assert await cache.get_or_compute(key, compute, soft_ttl=60, hard_ttl=60) == 2
+
+
+@pytest.mark.asyncio
+async def test_tagged_cache_invalidates_by_tag():
+    cache = TaggedCache(f"test-{uuid.uuid4().hex}", ttl=60, max_bytes=1024)
+    calls = []
+
+    @cache.cached("square", tags=lambda result, n: [f"n:{n}"])
+    async def square(n: int):
+        calls.append(n)
+        return n * n
+
+    assert await square(3) == 9
+    assert await square(n=3) == 9  # Same normalized arguments, same entry
+    assert await square(4) == 16
+    assert calls == [3, 4]
+
+    await cache.invalidate_tags("n:3")
+    assert await square(3) == 9
+    assert await square(4) == 16
+    assert calls == [3, 4, 3]
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_item_reads_are_invalidated_by_writes(ac, unique_email):
+    await ac.post("/api/v1/users/register", json={
+        "email": unique_email, "password": "password123", "first_name": "Cache", "last_name": "User"
+    })
+    login = await ac.post("/api/v1/users/login", data={"username": unique_email, "password": "password123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    created = await ac.post("/api/v1/items/", json={"name": "Cached", "category": "Books"}, headers=headers)
+    item_id = created.json()["id"]
+
+    assert (await ac.get(f"/api/v1/items/{item_id}", headers=headers)).json()["name"] == "Cached"
+    listed = await ac.get("/api/v1/items/", params={"category": "Books"}, headers=headers)
+    assert [i["name"] for i in listed.json()["items"]] == ["Cached"]
+
+    await ac.put(f"/api/v1/items/{item_id}", json={"name": "Renamed"}, headers=headers)
+
+    assert (await ac.get(f"/api/v1/items/{item_id}", headers=headers)).json()["name"] == "Renamed"
+    listed = await ac.get("/api/v1/items/", params={"category": "Books"}, headers=headers)
+    assert [i["name"] for i in listed.json()["items"]] == ["Renamed"]
+
+    await ac.delete(f"/api/v1/items/{item_id}", headers=headers)
+    assert (await ac.get(f"/api/v1/items/{item_id}", headers=headers)).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_list_fill_racing_a_write_is_not_served(ac, unique_email, db_session, monkeypatch):
+    await ac.post("/api/v1/users/register", json={
+        "email": unique_email, "password": "password123", "first_name": "Cache", "last_name": "User"
+    })
+    login = await ac.post("/api/v1/users/login", data={"username": unique_email, "password": "password123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    category = f"Race-{uuid.uuid4()}"
+    await ac.post("/api/v1/items/", json={"name": "Before", "category": category}, headers=headers)
+
+    original = item_repository.get_multi_paginated
+
+    async def read_then_write(*args, **kwargs):
+        result = await original(*args, **kwargs)
+        # Another request writes (and invalidates) after this read, before its cache fill
+        monkeypatch.setattr(item_repository, "get_multi_paginated", original)
+        await ItemService.create(db_session, ItemCreate(name="After", category=category))
+        return result
+
+    monkeypatch.setattr(item_repository, "get_multi_paginated", read_then_write)
+    stale = await ac.get("/api/v1/items/", params={"category": category}, headers=headers)
+    assert [i["name"] for i in stale.json()["items"]] == ["Before"]
+
+    fresh = await ac.get(
+        "/api/v1/items/", params={"category": category}, headers={**headers, "If-None-Match": stale.headers["etag"]}
+    )
+    assert fresh.status_code == 200
+    assert sorted(i["name"] for i in fresh.json()["items"]) == ["After", "Before"]
+
+
+@pytest.mark.asyncio
+async def test_item_fill_racing_a_write_is_not_served(ac, unique_email, db_session, monkeypatch):
+    await ac.post("/api/v1/users/register", json={
+        "email": unique_email, "password": "password123", "first_name": "Cache", "last_name": "User"
+    })
+    login = await ac.post("/api/v1/users/login", data={"username": unique_email, "password": "password123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    created = await ac.post("/api/v1/items/", json={"name": "Before", "category": "Race"}, headers=headers)
+    item_id = created.json()["id"]
+
+    original = item_repository.get_live_row
+
+    async def read_then_write(*args, **kwargs):
+        row = await original(*args, **kwargs)
+        # Another request updates (and invalidates) the item after this read, before its cache fill
+        monkeypatch.setattr(item_repository, "get_live_row", original)
+        item = await ItemService.get(db_session, uuid.UUID(item_id))
+        await ItemService.update(db_session, item, ItemUpdate(name="After"))
+        return row
+
+    monkeypatch.setattr(item_repository, "get_live_row", read_then_write)
+    stale = await ac.get(f"/api/v1/items/{item_id}", headers=headers)
+    assert stale.json()["name"] == "Before"
+
+    fresh = await ac.get(f"/api/v1/items/{item_id}", headers={**headers, "If-None-Match": stale.headers["etag"]})
+    assert fresh.status_code == 200
+    assert fresh.json()["name"] == "After"
+
+
+@pytest.mark.asyncio
+async def test_tagged_cache_drops_namespace_for_many_tags():
+    cache = TaggedCache(f"test-{uuid.uuid4().hex}", ttl=60, max_bytes=1024, max_tags=2)
+    calls = []
+
+    @cache.cached("square", tags=lambda result, n: [f"n:{n}"])
+    async def square(n: int):
+        calls.append(n)
+        return n * n
+
+    await square(3)
+    await square(4)
+    await cache.invalidate_tags("n:5", "n:6", "n:7")
+    assert await square(3) == 9
+    assert await square(4) == 16
+    assert calls == [3, 4, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_tagged_cache_tolerates_redis_errors(monkeypatch):
+    cache = TaggedCache(f"test-{uuid.uuid4().hex}", ttl=60, max_bytes=1024)
+
+    def broken_pipeline(*args, **kwargs):
+        raise RedisConnectionError("down")
+
+    monkeypatch.setattr(redis_client.redis_client, "pipeline", broken_pipeline)
+    await cache.invalidate_tags("n:3")
+
+
+@pytest.mark.asyncio
+async def test_item_list_served_while_redis_is_down(ac, unique_email, monkeypatch):
+    await ac.post("/api/v1/users/register", json={
+        "email": unique_email, "password": "password123", "first_name": "Cache", "last_name": "User"
+    })
+    login = await ac.post("/api/v1/users/login", data={"username": unique_email, "password": "password123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    category = f"Down-{uuid.uuid4()}"
+    await ac.post("/api/v1/items/", json={"name": "Listed", "category": category}, headers=headers)
+
+    # Every command now fails to connect
+    monkeypatch.setattr(redis_client, "redis_client", redis.from_url("redis://localhost:1/0", decode_responses=True))
+
+    for count in ("exact", "cached"):
+        resp = await ac.get("/api/v1/items/", params={"category": category, "count": count}, headers=headers)
+        assert resp.status_code == 200
+        assert "etag" not in resp.headers
+        assert resp.json()["total"] == 1
+        # Without Redis a "cached" count is an exact one
+        assert resp.json()["count_mode"] == "exact"
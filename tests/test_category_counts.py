@@ -0,0 +1,70 @@
+"""
+Category Counter Tests
+Tests that item writes keep item_category_counts in step and that
+reconciliation repairs drift.
+"""
+import uuid
+
+import pytest
+from sqlalchemy import select, update
+
+from app.models.item import Item, ItemCategoryCount
+from app.repositories.item_repository import item_repository
+from app.schemas.item import ItemCreate, ItemUpdate
+
+
+async def _stored_count(db_session, category: str) -> int:
+    result = await db_session.execute(
+        select(ItemCategoryCount.count).where(ItemCategoryCount.category == category)
+    )
+    return result.scalar() or 0
+
+
+@pytest.mark.asyncio
+async def test_writes_maintain_counters(db_session):
+    books, games = f"Books-{uuid.uuid4()}", f"Games-{uuid.uuid4()}"
+
+    first = await item_repository.create(db_session, obj_in=ItemCreate(name="A", category=books))
+    await item_repository.create(db_session, obj_in=ItemCreate(name="B", category=books))
+    assert await _stored_count(db_session, books) == 2
+
+    # Moving an item between categories moves its count
+    await item_repository.update(db_session, db_obj=first, obj_in=ItemUpdate(category=games))
+    assert await _stored_count(db_session, books) == 1
+    assert await _stored_count(db_session, games) == 1
+
+    # Soft delete decrements once, deleting again is a no-op
+    await item_repository.delete(db_session, db_obj=first)
+    await item_repository.delete(db_session, db_obj=first)
+    assert await _stored_count(db_session, games) == 0
+
+
+@pytest.mark.asyncio
+async def test_update_moves_count_from_the_stored_category(db_session):
+    books, games, toys = (f"{name}-{uuid.uuid4()}" for name in ("Books", "Games", "Toys"))
+    item = await item_repository.create(db_session, obj_in=ItemCreate(name="A", category=books))
+    await item_repository.update(db_session, db_obj=item, obj_in=ItemUpdate(category=games))
+
+    # A copy read before the first move still says books; the row says games
+    stale = Item(id=item.id, name="A", category=books)
+    await item_repository.update(db_session, db_obj=stale, obj_in=ItemUpdate(category=toys))
+    assert await _stored_count(db_session, books) == 0
+    assert await _stored_count(db_session, games) == 0
+    assert await _stored_count(db_session, toys) == 1
+
+
+@pytest.mark.asyncio
+async def test_reconcile_reports_and_repairs_drift(db_session):
+    category = f"Drift-{uuid.uuid4()}"
+    await item_repository.create(db_session, obj_in=ItemCreate(name="A", category=category))
+    await db_session.execute(
+        update(ItemCategoryCount).where(ItemCategoryCount.category == category).values(count=5)
+    )
+
+    drift = await item_repository.reconcile_category_counts(db_session, dry_run=True)
+    assert {"category": category, "stored": 5, "actual": 1} in drift
+    assert await _stored_count(db_session, category) == 5
+
+    await item_repository.reconcile_category_counts(db_session)
+    assert await _stored_count(db_session, category) == 1
+    assert await item_repository.reconcile_category_counts(db_session, dry_run=True) == []
@@ -0,0 +1,74 @@
+"""
+Connection Pool Instrumentation Tests
+Tests checkout wait / connect latency recording, the pool status snapshot
+and access to it.
+"""
+import asyncio
+from unittest import mock
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.core.pool import InstrumentedPool, pool_status
+
+
+@pytest.mark.asyncio
+async def test_pool_records_checkout_waits():
+    engine = create_async_engine(
+        settings.TEST_DATABASE_URL or settings.DATABASE_URL, poolclass=InstrumentedPool, pool_size=1, max_overflow=0
+    )
+    try:
+        async with engine.connect() as held:
+            await held.execute(text("SELECT 1"))
+            status = pool_status(engine)
+            assert (status["checked_out"], status["idle"]) == (1, 0)
+
+            async def second_checkout():
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+
+            waiter = asyncio.create_task(second_checkout())
+            await asyncio.sleep(0.1)
+            assert pool_status(engine)["waiting"] == 1
+
+        await waiter
+        status = pool_status(engine)
+        assert (status["checked_out"], status["idle"], status["waiting"]) == (0, 1, 0)
+        assert status["checkout_wait_seconds"]["count"] == 2
+        # The second checkout had to wait for the first connection to come back
+        assert status["checkout_wait_seconds"]["sum"] >= 0.1
+        assert status["connect_latency_seconds"]["count"] == 1
+    finally:
+        await engine.dispose()
+
+
+
+def test_checkout_with_a_free_slot_is_not_waiting():
+    seen = []
+
+    def creator():
+        # Runs inside the checkout: a connection can still be opened, nobody queues
+        seen.append(pool.waiting)
+        return mock.MagicMock()
+
+    pool = InstrumentedPool(creator, pool_size=1, max_overflow=0)
+    pool.connect().close()
+    assert seen == [0]
+    assert pool.waiting == 0
+
+@pytest.mark.asyncio
+async def test_internal_endpoints_require_token(ac: AsyncClient, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", None)
+    assert (await ac.get("/internal/db-pool")).status_code == 404
+
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "internal-test-token")
+    assert (await ac.get("/internal/db-pool")).status_code == 403
+    resp = await ac.get("/internal/cache-stats", headers={"X-Internal-Token": "wrong"})
+    assert resp.status_code == 403
+
+    resp = await ac.get("/internal/db-pool", headers={"X-Internal-Token": "internal-test-token"})
+    assert resp.status_code == 200
+    assert "checked_out" in resp.json()["primary"]
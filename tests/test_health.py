@@ -0,0 +1,62 @@
+"""
+Health Probe Tests
+Tests liveness, and readiness served from the background checker's result.
+"""
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.core.health import health_checker
+from app.core.redis import redis_client
+
+
+@pytest.mark.asyncio
+async def test_livez_does_no_io(ac: AsyncClient, monkeypatch):
+    monkeypatch.setattr(redis_client, "redis_client", None)
+    resp = await ac.get("/livez")
+    assert resp.status_code == 200
+    assert resp.json() == {"status": "alive"}
+
+
+@pytest.mark.asyncio
+async def test_readyz_reports_dependencies(ac: AsyncClient):
+    await health_checker.refresh()
+
+    resp = await ac.get("/readyz")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["status"] == "ready"
+    for name in ("database", "redis"):
+        assert body["checks"][name]["status"] == "up"
+        assert body["checks"][name]["latency_ms"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_readyz_fails_when_a_dependency_is_down(ac: AsyncClient, monkeypatch):
+    monkeypatch.setattr(redis_client, "redis_client", None)
+    await health_checker.refresh()
+
+    resp = await ac.get("/readyz")
+    assert resp.status_code == 503
+    checks = resp.json()["checks"]
+    assert checks["database"]["status"] == "up"
+    assert checks["redis"]["status"] == "down"
+
+
+@pytest.mark.asyncio
+async def test_slow_probe_times_out(ac: AsyncClient, monkeypatch):
+    async def hanging_probe():
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(settings, "HEALTH_CHECK_TIMEOUT_SECONDS", 0.05)
+    monkeypatch.setattr(health_checker, "_probe_database", hanging_probe)
+    await health_checker.refresh()
+
+    resp = await ac.get("/health")
+    assert resp.status_code == 503
+    database = resp.json()["checks"]["database"]
+    assert database["status"] == "down"
+    assert "timed out" in database["error"]
+    assert database["latency_ms"] < 1000
@@ -2,10 +2,12 @@
 Integration Tests for Case Study Backend
 Tests complete user flows and item CRUD operations with proper isolation.
 """
+import json
 import uuid
 
 import pytest
 from httpx import AsyncClient
+from app.core.config import settings
 
 
 @pytest.mark.asyncio
@@ -211,3 +213,555 @@ async def test_unauthorized_access(ac: AsyncClient):
     
     resp = await ac.get("/api/v1/items/")
     assert resp.status_code in [401, 403]
+
+
+@pytest.mark.asyncio
+async def test_cursor_pagination(ac: AsyncClient, unique_email: str):
+    """
+    Test walking the item list forwards and backwards with keyset cursors.
+    """
+    password = "cursortest123"
+
+    # Register and login
+    await ac.post("/api/v1/users/register", json={
+        "email": unique_email,
+        "password": password,
+        "first_name": "Cursor",
+        "last_name": "Test"
+    })
+    login_resp = await ac.post("/api/v1/users/login", data={
+        "username": unique_email,
+        "password": password
+    })
+    token = login_resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    category = f"Cursor-{uuid.uuid4()}"
+    for i in range(5):
+        await ac.post("/api/v1/items/", headers=headers, json={
+            "name": f"Cursor Item {i}",
+            "category": category
+        })
+
+    params = {"category": category, "per_page": 2, "sort_by": "name", "order": "asc"}
+
+    # First page comes from the regular page mode and hands out a cursor
+    resp = await ac.get("/api/v1/items/", headers=headers, params=params)
+    assert resp.status_code == 200
+    first = resp.json()
+    assert [i["name"] for i in first["items"]] == ["Cursor Item 0", "Cursor Item 1"]
+    assert first["prev_cursor"] is None
+    assert first["next_cursor"]
+
+    # Follow next_cursor until the end
+    seen = [i["name"] for i in first["items"]]
+    cursor = first["next_cursor"]
+    last = first
+    while cursor:
+        resp = await ac.get("/api/v1/items/", headers=headers, params={**params, "cursor": cursor})
+        assert resp.status_code == 200
+        last = resp.json()
+        assert last["page"] is None
+        # Keyset steps skip the count unless one is asked for
+        assert (last["count_mode"], last["total"], last["pages"]) == ("none", None, None)
+        seen.extend(i["name"] for i in last["items"])
+        cursor = last["next_cursor"]
+    assert seen == [f"Cursor Item {i}" for i in range(5)]
+
+    # Walk one page back from the last page, this time with a count
+    resp = await ac.get(
+        "/api/v1/items/", headers=headers, params={**params, "cursor": last["prev_cursor"], "count": "exact"}
+    )
+    assert resp.status_code == 200
+    assert [i["name"] for i in resp.json()["items"]] == ["Cursor Item 2", "Cursor Item 3"]
+    assert (resp.json()["count_mode"], resp.json()["total"]) == ("exact", 5)
+
+    # Cursors are tied to the sort they were issued for
+    resp = await ac.get("/api/v1/items/", headers=headers, params={**params, "order": "desc", "cursor": first["next_cursor"]})
+    assert resp.status_code == 400
+
+    resp = await ac.get("/api/v1/items/", headers=headers, params={**params, "cursor": "not-a-cursor"})
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_list_count_modes(ac: AsyncClient, unique_email: str):
+    """
+    Test that every count mode is reported back and cached counts follow writes.
+    """
+    password = "countmodes123"
+
+    # Register and login
+    await ac.post("/api/v1/users/register", json={
+        "email": unique_email,
+        "password": password,
+        "first_name": "Count",
+        "last_name": "Modes"
+    })
+    login_resp = await ac.post("/api/v1/users/login", data={
+        "username": unique_email,
+        "password": password
+    })
+    token = login_resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    category = f"Count-{uuid.uuid4()}"
+    for i in range(2):
+        await ac.post("/api/v1/items/", headers=headers, json={"name": f"Count {i}", "category": category})
+
+    for mode in ("exact", "estimated", "cached"):
+        resp = await ac.get("/api/v1/items/", headers=headers, params={"category": category, "count": mode})
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["count_mode"] == mode
+        assert isinstance(body["total"], int)
+
+    resp = await ac.get("/api/v1/items/", headers=headers, params={"category": category, "count": "none"})
+    assert resp.json()["total"] is None
+    assert resp.json()["pages"] is None
+
+    # Creating an item invalidates the cached count
+    await ac.post("/api/v1/items/", headers=headers, json={"name": "Count 2", "category": category})
+    resp = await ac.get("/api/v1/items/", headers=headers, params={"category": category, "count": "cached"})
+    assert resp.json()["total"] == 3
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_items(ac: AsyncClient, unique_email: str):
+    """
+    Test bulk item creation in atomic and partial modes.
+    """
+    password = "bulkcreate123"
+
+    # Register and login
+    await ac.post("/api/v1/users/register", json={
+        "email": unique_email,
+        "password": password,
+        "first_name": "Bulk",
+        "last_name": "Create"
+    })
+    login_resp = await ac.post("/api/v1/users/login", data={
+        "username": unique_email,
+        "password": password
+    })
+    token = login_resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    category = f"Bulk-{uuid.uuid4()}"
+    rows = [
+        {"name": "Bulk 0", "category": category},
+        {"name": "Bulk 1", "category": category, "status": "unknown"},
+        {"name": "Bulk 2", "category": category, "status": "draft"},
+    ]
+
+    # Atomic: one invalid row rejects the batch
+    resp = await ac.post("/api/v1/items/bulk", headers=headers, json={"items": rows})
+    assert resp.status_code == 422
+    assert resp.json()["details"][0]["index"] == 1
+    resp = await ac.get("/api/v1/items/", headers=headers, params={"category": category})
+    assert resp.json()["total"] == 0
+
+    # Partial: valid rows are created, in request order
+    resp = await ac.post("/api/v1/items/bulk", headers=headers, json={"items": rows, "mode": "partial"})
+    assert resp.status_code == 201
+    body = resp.json()
+    assert [i["name"] for i in body["created"]] == ["Bulk 0", "Bulk 2"]
+    assert body["created"][1]["status"] == "draft"
+    assert [e["index"] for e in body["errors"]] == [1]
+
+    resp = await ac.get("/api/v1/items/", headers=headers, params={"category": category})
+    assert resp.json()["total"] == 2
+
+    # An explicit null status is a validation error, not a NOT NULL violation
+    resp = await ac.post("/api/v1/items/bulk", headers=headers, json={
+        "items": [{"name": "Null", "category": category, "status": None}]
+    })
+    assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_rejected_by_database(ac: AsyncClient, unique_email: str):
+    """
+    Test that an atomic batch the database rejects is a 422, not a 500.
+    """
+    password = "bulkdb123"
+
+    # Register and login
+    await ac.post("/api/v1/users/register", json={
+        "email": unique_email,
+        "password": password,
+        "first_name": "Bulk",
+        "last_name": "Database"
+    })
+    login_resp = await ac.post("/api/v1/users/login", data={
+        "username": unique_email,
+        "password": password
+    })
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+    # NUL bytes pass validation but not Postgres. The batch is rolled back,
+    # so nothing that follows may rely on this test's earlier rows.
+    category = f"Rejected-{uuid.uuid4()}"
+    resp = await ac.post("/api/v1/items/bulk", headers=headers, json={
+        "items": [{"name": "Fine", "category": category}, {"name": "Bad\u0000", "category": category}]
+    })
+    assert resp.status_code == 422
+    assert resp.json()["details"][0]["index"] == 0
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_and_delete_items(ac: AsyncClient, unique_email: str):
+    """
+    Test set-based bulk update and soft delete by filter and by ids.
+    """
+    password = "bulkupdate123"
+
+    # Register and login
+    await ac.post("/api/v1/users/register", json={
+        "email": unique_email,
+        "password": password,
+        "first_name": "Bulk",
+        "last_name": "Update"
+    })
+    login_resp = await ac.post("/api/v1/users/login", data={
+        "username": unique_email,
+        "password": password
+    })
+    token = login_resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    old_category, new_category = f"Old-{uuid.uuid4()}", f"New-{uuid.uuid4()}"
+    resp = await ac.post("/api/v1/items/bulk", headers=headers, json={
+        "items": [{"name": f"Move {i}", "category": old_category} for i in range(3)]
+    })
+    ids = [i["id"] for i in resp.json()["created"]]
+
+    # A selector is mandatory
+    resp = await ac.post("/api/v1/items/bulk/delete", headers=headers, json={})
+    assert resp.status_code == 422
+
+    # Move the whole category
+    resp = await ac.post("/api/v1/items/bulk/update", headers=headers, json={
+        "category": old_category,
+        "update": {"category": new_category},
+        "return_rows": True
+    })
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["affected"] == 3
+    assert {i["category"] for i in body["items"]} == {new_category}
+
+    # Soft delete two of them by id
+    resp = await ac.post("/api/v1/items/bulk/delete", headers=headers, json={"ids": ids[:2]})
+    assert resp.json() == {"affected": 2, "items": None}
+
+    resp = await ac.get("/api/v1/items/analytics/category-density", headers=headers)
+    categories = {c["category"]: c["count"] for c in resp.json()["data"]["categories"]}
+    assert old_category not in categories
+    assert categories[new_category] == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_rejections(ac: AsyncClient, unique_email: str, monkeypatch):
+    """
+    Test that null updates and oversized filter selections are rejected without writing.
+    """
+    password = "bulkreject123"
+
+    # Register and login
+    await ac.post("/api/v1/users/register", json={
+        "email": unique_email,
+        "password": password,
+        "first_name": "Bulk",
+        "last_name": "Reject"
+    })
+    login_resp = await ac.post("/api/v1/users/login", data={
+        "username": unique_email,
+        "password": password
+    })
+    token = login_resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    category = f"Cap-{uuid.uuid4()}"
+    await ac.post("/api/v1/items/bulk", headers=headers, json={
+        "items": [{"name": f"Cap {i}", "category": category} for i in range(3)]
+    })
+
+    # The columns are NOT NULL: an explicit null is a validation error
+    for field in ("name", "category", "status"):
+        resp = await ac.post("/api/v1/items/bulk/update", headers=headers, json={
+            "category": category,
+            "update": {field: None}
+        })
+        assert resp.status_code == 422
+
+    monkeypatch.setattr(settings, "ITEM_BULK_MAX_SIZE", 2)
+    resp = await ac.post("/api/v1/items/bulk/update", headers=headers, json={
+        "category": category,
+        "update": {"name": "Renamed"}
+    })
+    assert resp.status_code == 422
+    resp = await ac.post("/api/v1/items/bulk/delete", headers=headers, json={"category": category})
+    assert resp.status_code == 422
+
+    resp = await ac.get("/api/v1/items/", headers=headers, params={"category": category})
+    assert resp.json()["total"] == 3
+    assert {i["name"] for i in resp.json()["items"]} == {"Cap 0", "Cap 1", "Cap 2"}
+
+
+@pytest.mark.asyncio
+async def test_conditional_item_reads(ac: AsyncClient, unique_email: str):
+    """
+    Test ETag / If-None-Match handling on item and list reads.
+    """
+    password = "etagtest123"
+
+    # Register and login
+    await ac.post("/api/v1/users/register", json={
+        "email": unique_email,
+        "password": password,
+        "first_name": "Etag",
+        "last_name": "Test"
+    })
+    login_resp = await ac.post("/api/v1/users/login", data={
+        "username": unique_email,
+        "password": password
+    })
+    token = login_resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    resp = await ac.post("/api/v1/items/", headers=headers, json={"name": "Etag Item", "category": "Etag"})
+    item_id = resp.json()["id"]
+
+    # Single item
+    resp = await ac.get(f"/api/v1/items/{item_id}", headers=headers)
+    etag = resp.headers["etag"]
+    resp = await ac.get(f"/api/v1/items/{item_id}", headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == etag
+
+    # List
+    resp = await ac.get("/api/v1/items/", headers=headers, params={"category": "Etag"})
+    list_etag = resp.headers["etag"]
+    resp = await ac.get("/api/v1/items/", headers={**headers, "If-None-Match": list_etag}, params={"category": "Etag"})
+    assert resp.status_code == 304
+
+    # Any write changes both
+    await ac.put(f"/api/v1/items/{item_id}", headers=headers, json={"name": "Etag Item 2"})
+    resp = await ac.get(f"/api/v1/items/{item_id}", headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != etag
+    resp = await ac.get("/api/v1/items/", headers={**headers, "If-None-Match": list_etag}, params={"category": "Etag"})
+    assert resp.status_code == 200
+
+    # Analytics advertise their cache lifetime
+    resp = await ac.get("/api/v1/items/analytics/category-density")
+    assert resp.headers["cache-control"].startswith("public, max-age=")
+
+
+@pytest.mark.asyncio
+async def test_export_items(ac: AsyncClient, unique_email: str):
+    """
+    Test streaming the filtered item list as NDJSON and CSV.
+    """
+    password = "exporttest123"
+
+    # Register and login
+    await ac.post("/api/v1/users/register", json={
+        "email": unique_email,
+        "password": password,
+        "first_name": "Export",
+        "last_name": "Test"
+    })
+    login_resp = await ac.post("/api/v1/users/login", data={
+        "username": unique_email,
+        "password": password
+    })
+    token = login_resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    category = f"Export-{uuid.uuid4()}"
+    for i in range(3):
+        await ac.post("/api/v1/items/", headers=headers, json={
+            "name": f"Export Item {i}",
+            "category": category
+        })
+    await ac.post("/api/v1/items/", headers=headers, json={"name": "Other", "category": "Elsewhere"})
+
+    params = {"category": category, "sort_by": "name", "order": "asc"}
+
+    resp = await ac.get("/api/v1/items/export", headers=headers, params=params)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert [r["name"] for r in rows] == ["Export Item 0", "Export Item 1", "Export Item 2"]
+    assert all(r["category"] == category for r in rows)
+
+    resp = await ac.get("/api/v1/items/export", headers=headers, params={**params, "format": "csv"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+    lines = resp.text.splitlines()
+    assert lines[0] == "id,name,category,status,created_at,updated_at"
+    assert [line.split(",")[1] for line in lines[1:]] == ["Export Item 0", "Export Item 1", "Export Item 2"]
+
+    resp = await ac.get("/api/v1/items/export", headers=headers, params={"format": "xml"})
+    assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_import_items(ac: AsyncClient, unique_email: str):
+    """
+    Test the COPY-based CSV/NDJSON import and its report.
+    """
+    password = "importtest123"
+
+    # Register and login
+    await ac.post("/api/v1/users/register", json={
+        "email": unique_email,
+        "password": password,
+        "first_name": "Import",
+        "last_name": "Test"
+    })
+    login_resp = await ac.post("/api/v1/users/login", data={
+        "username": unique_email,
+        "password": password
+    })
+    token = login_resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    category = f"Import-{uuid.uuid4()}"
+    existing_id = uuid.uuid4()
+    csv_body = (
+        "name,category,status,id\n"
+        f"Imported A,{category},,\n"
+        f"Imported B,{category},draft,{existing_id}\n"
+        f"Bad Status,{category},bogus,\n"
+        "No Category,,,\n"
+    )
+    resp = await ac.post(
+        "/api/v1/items/import", headers=headers, files={"file": ("items.csv", csv_body, "text/csv")}
+    )
+    assert resp.status_code == 200
+    report = resp.json()
+    assert report["received"] == 4
+    assert report["imported"] == 2
+    assert report["rejected"] == 2
+    assert [e["row"] for e in report["errors"]] == [3, 4]
+    assert report["rows_per_second"] > 0
+
+    # Re-importing a known id is a duplicate, not an error
+    ndjson_body = (
+        json.dumps({"id": str(existing_id), "name": "Imported B again", "category": category}) + "\n"
+        + json.dumps({"name": "Imported C", "category": category}) + "\n"
+    )
+    resp = await ac.post(
+        "/api/v1/items/import", headers=headers, params={"format": "ndjson"},
+        files={"file": ("items.ndjson", ndjson_body, "application/x-ndjson")}
+    )
+    assert resp.status_code == 200
+    report = resp.json()
+    assert (report["imported"], report["duplicates"], report["rejected"]) == (1, 1, 0)
+
+    resp = await ac.get("/api/v1/items/", headers=headers, params={"category": category, "sort_by": "name", "order": "asc"})
+    assert [i["name"] for i in resp.json()["items"]] == ["Imported A", "Imported B", "Imported C"]
+
+    # Category counters were bumped by the merge
+    resp = await ac.get("/api/v1/items/analytics/category-density")
+    counts = {c["category"]: c["count"] for c in resp.json()["data"]["categories"]}
+    assert counts[category] == 3
+
+
+@pytest.mark.asyncio
+async def test_sparse_fieldsets(ac: AsyncClient, unique_email: str):
+    """
+    Test `fields` on the list and get-by-id endpoints.
+    """
+    password = "fieldstest123"
+
+    # Register and login
+    await ac.post("/api/v1/users/register", json={
+        "email": unique_email,
+        "password": password,
+        "first_name": "Fields",
+        "last_name": "Test"
+    })
+    login_resp = await ac.post("/api/v1/users/login", data={
+        "username": unique_email,
+        "password": password
+    })
+    token = login_resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    category = f"Fields-{uuid.uuid4()}"
+    for i in range(3):
+        resp = await ac.post("/api/v1/items/", headers=headers, json={
+            "name": f"Fields Item {i}",
+            "category": category
+        })
+    item_id = resp.json()["id"]
+
+    params = {"category": category, "per_page": 2, "sort_by": "name", "order": "asc", "fields": "id,name"}
+    resp = await ac.get("/api/v1/items/", headers=headers, params=params)
+    assert resp.status_code == 200
+    page = resp.json()
+    assert [set(i) for i in page["items"]] == [{"id", "name"}, {"id", "name"}]
+    assert page["total"] == 3
+
+    # Cursors still work although the sort column is not among the fields
+    resp = await ac.get("/api/v1/items/", headers=headers, params={**params, "fields": "status", "cursor": page["next_cursor"]})
+    assert resp.json()["items"] == [{"status": "active"}]
+
+    resp = await ac.get(f"/api/v1/items/{item_id}", headers=headers, params={"fields": "name,status"})
+    assert resp.status_code == 200
+    assert resp.json() == {"name": "Fields Item 2", "status": "active"}
+
+    # A different field set is a different representation
+    full = await ac.get(f"/api/v1/items/{item_id}", headers=headers)
+    assert full.headers["etag"] != resp.headers["etag"]
+
+    resp = await ac.get("/api/v1/items/", headers=headers, params={"fields": "id,password"})
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_search_items(ac: AsyncClient, unique_email: str):
+    """
+    Test the `q` name search: ranking, filters and soft-deleted rows.
+    """
+    password = "searchtest123"
+
+    # Register and login
+    await ac.post("/api/v1/users/register", json={
+        "email": unique_email,
+        "password": password,
+        "first_name": "Search",
+        "last_name": "Test"
+    })
+    login_resp = await ac.post("/api/v1/users/login", data={
+        "username": unique_email,
+        "password": password
+    })
+    token = login_resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    category = f"Search-{uuid.uuid4()}"
+    for name in ["Pineapple", "Apple Pie Deluxe", "Banana", "Apple"]:
+        await ac.post("/api/v1/items/", headers=headers, json={"name": name, "category": category})
+    resp = await ac.post("/api/v1/items/", headers=headers, json={"name": "Apple Juice", "category": category})
+    await ac.delete(f"/api/v1/items/{resp.json()['id']}", headers=headers)
+    await ac.post("/api/v1/items/", headers=headers, json={"name": "Apple", "category": "Elsewhere"})
+
+    params = {"category": category, "q": "apple"}
+    resp = await ac.get("/api/v1/items/", headers=headers, params=params)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [i["name"] for i in data["items"]] == ["Apple", "Apple Pie Deluxe", "Pineapple"]
+    assert data["total"] == 3
+    assert data["next_cursor"] is None
+
+    # Small typos still match
+    resp = await ac.get("/api/v1/items/", headers=headers, params={"category": category, "q": "bananna"})
+    assert [i["name"] for i in resp.json()["items"]] == ["Banana"]
+
+    resp = await ac.get("/api/v1/items/", headers=headers, params={**params, "cursor": "abc"})
+    assert resp.status_code == 400
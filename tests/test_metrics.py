@@ -0,0 +1,70 @@
+"""
+Metrics Endpoint Tests
+Tests that requests, DB statements, Redis commands and cache counters show up
+in the Prometheus exposition.
+"""
+import re
+
+import pytest
+
+from app.core.metrics import MetricsRegistry
+
+
+def _sample(text: str, name: str, **labels) -> float:
+    pattern = re.escape(name) + r"\{([^}]*)\} (\S+)"
+    for match in re.finditer(pattern, text):
+        found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(1)))
+        if all(found.get(k) == v for k, v in labels.items()):
+            return float(match.group(2))
+    return 0.0
+
+
+def test_histogram_exposition_format():
+    registry = MetricsRegistry()
+    family = registry.histogram("demo_seconds", "Demo.", ("route",), buckets=(0.1, 1.0))
+    family.labels('/a"b').observe(0.05)
+    family.labels('/a"b').observe(2.0)
+
+    assert registry.render().splitlines() == [
+        "# HELP demo_seconds Demo.",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{route="/a\\"b",le="0.1"} 1',
+        'demo_seconds_bucket{route="/a\\"b",le="1.0"} 1',
+        'demo_seconds_bucket{route="/a\\"b",le="+Inf"} 2',
+        'demo_seconds_sum{route="/a\\"b"} 2.05',
+        'demo_seconds_count{route="/a\\"b"} 2',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(ac, unique_email):
+    before = (await ac.get("/metrics")).text
+
+    await ac.post("/api/v1/users/register", json={
+        "email": unique_email,
+        "password": "metricstest123",
+        "first_name": "Metrics",
+        "last_name": "Test"
+    })
+    login = await ac.post("/api/v1/users/login", data={"username": unique_email, "password": "metricstest123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    await ac.get("/api/v1/items/", headers=headers)
+    await ac.get("/api/v1/items/", headers=headers)
+    await ac.get("/no-such-route")
+
+    resp = await ac.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    after = resp.text
+
+    def delta(name, **labels):
+        return _sample(after, name, **labels) - _sample(before, name, **labels)
+
+    # Labelled by route template, not by raw path
+    assert delta("http_request_duration_seconds_count", method="GET", route="/api/v1/items/", status="200") == 2
+    assert delta("http_request_duration_seconds_count", method="GET", route="unmatched", status="404") == 1
+    assert delta("db_statement_duration_seconds_count", operation="SELECT") >= 1
+    assert delta("redis_command_duration_seconds_count", command="GET") >= 1
+    # The second list read is served from the item cache
+    assert delta("cache_hits_total", cache="item") >= 1
+    assert 0 <= _sample(after, "cache_hit_ratio", cache="item") <= 1
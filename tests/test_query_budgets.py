@@ -0,0 +1,130 @@
+"""
+Query Budget Tests
+Pins the number of SQL statements the auth and item routes run, so an N+1 or
+an extra round trip fails here instead of showing up in production.
+"""
+import asyncio
+import logging
+import uuid
+
+import pytest
+from httpx import AsyncClient
+
+from app.core import database
+from app.core.config import settings
+
+
+async def _login(ac: AsyncClient, email: str, assert_max_queries) -> dict:
+    password = "budgettest123"
+    with assert_max_queries(1):
+        resp = await ac.post("/api/v1/users/register", json={
+            "email": email,
+            "password": password,
+            "first_name": "Budget",
+            "last_name": "Test"
+        })
+    assert resp.status_code == 201
+    with assert_max_queries(1):
+        resp = await ac.post("/api/v1/users/login", data={"username": email, "password": password})
+    assert resp.status_code == 200
+    return resp.json()
+
+
+@pytest.mark.asyncio
+async def test_auth_route_budgets(ac: AsyncClient, unique_email: str, assert_max_queries):
+    tokens = await _login(ac, unique_email, assert_max_queries)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    # The first authenticated request loads the user, later ones hit the user cache
+    with assert_max_queries(1):
+        assert (await ac.get("/api/v1/users/profile", headers=headers)).status_code == 200
+    with assert_max_queries(0):
+        assert (await ac.get("/api/v1/users/profile", headers=headers)).status_code == 200
+
+    with assert_max_queries(1):
+        resp = await ac.post("/api/v1/users/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert resp.status_code == 200
+    with assert_max_queries(0):
+        assert (await ac.post("/api/v1/users/logout", headers=headers)).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_item_route_budgets(ac: AsyncClient, unique_email: str, assert_max_queries):
+    tokens = await _login(ac, unique_email, assert_max_queries)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    await ac.get("/api/v1/users/profile", headers=headers)  # warm the user cache
+    category = f"Budget-{uuid.uuid4()}"
+
+    # Category counter upsert + INSERT, whatever the number of rows
+    with assert_max_queries(2):
+        resp = await ac.post("/api/v1/items/", headers=headers, json={"name": "Budget", "category": category})
+    assert resp.status_code == 201
+    item_id = resp.json()["id"]
+    with assert_max_queries(2):
+        resp = await ac.post("/api/v1/items/bulk", headers=headers, json={
+            "items": [{"name": f"Budget {i}", "category": category} for i in range(50)]
+        })
+    assert resp.status_code == 201
+
+    # Count + page on a miss, nothing once cached
+    params = {"category": category, "per_page": 100}
+    with assert_max_queries(2):
+        resp = await ac.get("/api/v1/items/", headers=headers, params=params)
+    assert resp.json()["total"] == 51
+    with assert_max_queries(0):
+        await ac.get("/api/v1/items/", headers=headers, params=params)
+
+    with assert_max_queries(1):
+        resp = await ac.get(f"/api/v1/items/{item_id}", headers=headers)
+    etag = resp.headers["etag"]
+    # Revalidation is answered from the cached read
+    with assert_max_queries(0):
+        resp = await ac.get(f"/api/v1/items/{item_id}", headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 304
+
+    with assert_max_queries(2):
+        resp = await ac.put(f"/api/v1/items/{item_id}", headers=headers, json={"name": "Budget renamed"})
+    assert resp.status_code == 200
+    with assert_max_queries(3):
+        assert (await ac.delete(f"/api/v1/items/{item_id}", headers=headers)).status_code == 200
+
+    with assert_max_queries(2):
+        resp = await ac.post("/api/v1/items/bulk/update", headers=headers, json={
+            "category": category, "update": {"category": f"{category}-moved"}
+        })
+    assert resp.json()["affected"] == 50
+    with assert_max_queries(2):
+        resp = await ac.post("/api/v1/items/bulk/delete", headers=headers, json={"category": f"{category}-moved"})
+    assert resp.json()["affected"] == 50
+
+
+@pytest.mark.asyncio
+async def test_server_timing_header(ac: AsyncClient, unique_email: str, assert_max_queries):
+    tokens = await _login(ac, unique_email, assert_max_queries)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    resp = await ac.get("/api/v1/items/", headers=headers)
+    timing = {
+        metric.split(";")[0].strip(): metric for metric in resp.headers["server-timing"].split(",")
+    }
+    assert set(timing) == {"db", "redis", "app"}
+    # User lookup, count and page
+    assert 'desc="3 queries"' in timing["db"]
+
+
+@pytest.mark.asyncio
+async def test_slow_statements_are_logged_with_plan(ac: AsyncClient, unique_email: str, caplog, monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_SLOW_QUERY_SECONDS", 0)
+    monkeypatch.setattr(settings, "DATABASE_SLOW_QUERY_EXPLAIN_RATE", 1)
+
+    with caplog.at_level(logging.WARNING, logger="app"):
+        await ac.post("/api/v1/users/login", data={"username": unique_email, "password": "whatever"})
+        await asyncio.gather(*database._explain_tasks)
+
+    messages = [r.getMessage() for r in caplog.records]
+    slow = [m for m in messages if m.startswith("Slow statement")]
+    plans = [m for m in messages if m.startswith("Plan of slow statement")]
+    assert any("parameters (str)" in m and "FROM users" in m for m in slow)
+    assert any("FROM users" in m and "actual time" in m for m in plans)
+    # Parameter values make it into neither the statements nor their plans
+    assert not any(unique_email in m for m in slow + plans)
@@ -0,0 +1,90 @@
+"""
+Rate Limiting Tests
+Tests the Redis token bucket script, per-client limits on the auth and item
+routes, the RateLimit-* headers and the in-process fallback.
+"""
+import uuid
+
+import pytest
+from httpx import AsyncClient
+
+from app.api.v1.endpoints import auth, items
+from app.core import rate_limit
+from app.core.redis import redis_client
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_script():
+    key = f"ratelimit:test:{uuid.uuid4()}"
+    assert (await redis_client.take_token(key, capacity=2, rate=1))[0]
+    allowed, tokens, _ = await redis_client.take_token(key, capacity=2, rate=1)
+    assert allowed and tokens < 1
+    allowed, _, retry_after = await redis_client.take_token(key, capacity=2, rate=1)
+    assert not allowed
+    assert 0 < retry_after <= 1
+    assert await redis_client.redis_client.ttl(key) > 0
+
+
+def test_local_buckets_refill(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    buckets = rate_limit.LocalTokenBuckets(maxsize=10)
+
+    assert buckets.take("k", capacity=2, rate=1)[0]
+    assert buckets.take("k", capacity=2, rate=1)[0]
+    allowed, _, retry_after = buckets.take("k", capacity=2, rate=1)
+    assert not allowed and retry_after == pytest.approx(1)
+
+    now[0] += 1
+    assert buckets.take("k", capacity=2, rate=1)[0]
+
+
+@pytest.mark.asyncio
+async def test_login_is_limited_per_address(ac: AsyncClient, unique_email: str, monkeypatch):
+    monkeypatch.setattr(auth.login_rate_limit, "limit", 2)
+    form = {"username": unique_email, "password": "wrongpassword"}
+
+    for remaining in ("1", "0"):
+        resp = await ac.post("/api/v1/users/login", data=form)
+        assert resp.status_code == 400
+        assert resp.headers["ratelimit-limit"] == "2"
+        assert resp.headers["ratelimit-remaining"] == remaining
+        assert resp.headers["ratelimit-policy"] == "2;w=60"
+
+    resp = await ac.post("/api/v1/users/login", data=form)
+    assert resp.status_code == 429
+    assert int(resp.headers["retry-after"]) == 30
+    assert resp.json()["message"] == "Too many requests"
+
+
+@pytest.mark.asyncio
+async def test_items_are_limited_per_user(ac: AsyncClient, monkeypatch):
+    headers = []
+    for _ in range(2):
+        email, password = f"test_{uuid.uuid4()}@example.com", "ratelimit123"
+        await ac.post("/api/v1/users/register", json={
+            "email": email,
+            "password": password,
+            "first_name": "Rate",
+            "last_name": "Limit"
+        })
+        login = await ac.post("/api/v1/users/login", data={"username": email, "password": password})
+        headers.append({"Authorization": f"Bearer {login.json()['access_token']}"})
+
+    monkeypatch.setattr(items.rate_limit, "limit", 1)
+    assert (await ac.get("/api/v1/items/", headers=headers[0])).status_code == 200
+    assert (await ac.get("/api/v1/items/", headers=headers[0])).status_code == 429
+    # Same address, different user: a bucket of its own
+    assert (await ac.get("/api/v1/items/", headers=headers[1])).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_local_buckets_without_redis(ac: AsyncClient, monkeypatch):
+    monkeypatch.setattr(redis_client, "redis_client", None)
+    monkeypatch.setattr(rate_limit, "_local_buckets", rate_limit.LocalTokenBuckets(maxsize=10))
+    monkeypatch.setattr(auth.register_rate_limit, "limit", 1)
+
+    assert (await ac.post("/api/v1/users/register", json={"email": "not-an-email"})).status_code == 422
+    resp = await ac.post("/api/v1/users/register", json={"email": "not-an-email"})
+    assert resp.status_code == 429
+    assert "retry-after" in resp.headers
@@ -0,0 +1,65 @@
+"""
+Read Replica Routing Tests
+Tests that read-only sessions go to a replica unless the client just wrote.
+"""
+import itertools
+
+import pytest
+from starlette.requests import Request
+
+from app.core import database
+from app.core.config import settings
+
+
+def _request(token: str = None, host: str = "10.0.0.1") -> Request:
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return Request({"type": "http", "method": "GET", "headers": headers, "client": (host, 1234)})
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    factory = object()
+    monkeypatch.setattr(database, "read_engines", [object()])
+    monkeypatch.setattr(database, "_replica_session_factories", itertools.cycle([factory]))
+    return factory
+
+
+@pytest.mark.asyncio
+async def test_reads_use_replica_unless_client_just_wrote(replica):
+    assert await database.get_read_session_factory(_request()) is replica
+
+    await database.mark_recent_writer(_request())
+    assert await database.get_read_session_factory(_request()) is database.AsyncSessionLocal
+    # Other clients are not affected
+    assert await database.get_read_session_factory(_request(host="10.0.0.2")) is replica
+
+
+@pytest.mark.asyncio
+async def test_reads_use_primary_without_replicas():
+    assert await database.get_read_session_factory(_request()) is database.AsyncSessionLocal
+
+
+@pytest.mark.asyncio
+async def test_item_writes_mark_user_for_primary_reads(ac, unique_email, replica, monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_READ_LAG_SECONDS", 1)
+    await ac.post("/api/v1/users/register", json={
+        "email": unique_email,
+        "password": "replicatest123",
+        "first_name": "Replica",
+        "last_name": "Test"
+    })
+    login = await ac.post("/api/v1/users/login", data={"username": unique_email, "password": "replicatest123"})
+    token = login.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # Auth routes write no items, failed writes write nothing
+    assert await database.get_read_session_factory(_request(token)) is replica
+    resp = await ac.post("/api/v1/items/", headers=headers, json={"name": "Replica"})
+    assert resp.status_code == 422
+    assert await database.get_read_session_factory(_request(token)) is replica
+
+    # No cookie is needed: the user is recognised by the bearer token alone
+    resp = await ac.post("/api/v1/items/", headers=headers, json={"name": "Replica", "category": "Replica"})
+    assert resp.status_code == 201
+    assert "set-cookie" not in resp.headers
+    assert await database.get_read_session_factory(_request(token, host="10.0.0.9")) is database.AsyncSessionLocal
@@ -86,3 +86,44 @@ async def test_refresh_token_flow(ac: AsyncClient, unique_email: str):
     assert "access_token" in new_tokens
     assert "refresh_token" in new_tokens
     # Note: Token might be identical if generated in same second (same exp timestamp)
+
+
+@pytest.mark.asyncio
+async def test_revocation_is_per_token(ac: AsyncClient, unique_email: str):
+    """
+    Test that logout revokes only the presented token (by jti) and records it
+    in Redis with a TTL bounded by the token's own expiry.
+    """
+    from jose import jwt
+    from app.core.config import settings
+    from app.core.redis import redis_client
+
+    password = "jtirevoke123"
+    await ac.post("/api/v1/users/register", json={
+        "email": unique_email,
+        "password": password,
+        "first_name": "Jti",
+        "last_name": "Test"
+    })
+    tokens = []
+    for _ in range(2):
+        login_resp = await ac.post("/api/v1/users/login", data={
+            "username": unique_email,
+            "password": password
+        })
+        tokens.append(login_resp.json()["access_token"])
+
+    revoked, kept = tokens
+    jti = jwt.get_unverified_claims(revoked)["jti"]
+    assert jti != jwt.get_unverified_claims(kept)["jti"]
+
+    resp = await ac.post("/api/v1/users/logout", headers={"Authorization": f"Bearer {revoked}"})
+    assert resp.status_code == 200
+
+    ttl = await redis_client.redis_client.ttl(f"revoked:{jti}")
+    assert 0 < ttl <= settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60 + 1
+
+    resp = await ac.get("/api/v1/users/profile", headers={"Authorization": f"Bearer {revoked}"})
+    assert resp.status_code == 401
+    resp = await ac.get("/api/v1/users/profile", headers={"Authorization": f"Bearer {kept}"})
+    assert resp.status_code == 200
@@ -0,0 +1,97 @@
+"""
+User Cache Tests
+Tests that get_current_user is served from the cache and that profile
+updates invalidate it, in Redis and in every worker's memory.
+"""
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.repositories.user_repository import user_repository
+from app.services.user_cache import USER_INVALIDATION_CHANNEL, user_cache
+
+
+@pytest.mark.asyncio
+async def test_current_user_cached_and_invalidated(ac: AsyncClient, unique_email: str, monkeypatch):
+    password = "usercache123"
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "internal-test-token")
+    internal = {"X-Internal-Token": "internal-test-token"}
+
+    # Register & Login
+    await ac.post("/api/v1/users/register", json={
+        "email": unique_email,
+        "password": password,
+        "first_name": "Cache",
+        "last_name": "User"
+    })
+    login_resp = await ac.post("/api/v1/users/login", data={
+        "username": unique_email,
+        "password": password
+    })
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+    before = (await ac.get("/internal/cache-stats", headers=internal)).json()["user_cache"]
+
+    # First request loads the user, the second is served from memory
+    assert (await ac.get("/api/v1/users/profile", headers=headers)).status_code == 200
+    assert (await ac.get("/api/v1/users/profile", headers=headers)).status_code == 200
+
+    after = (await ac.get("/internal/cache-stats", headers=internal)).json()["user_cache"]
+    assert after["misses"] == before["misses"] + 1
+    assert after["local_hits"] == before["local_hits"] + 1
+
+    # Updating the profile (through the cached user) invalidates the entry
+    resp = await ac.put("/api/v1/users/profile", headers=headers, json={"first_name": "Changed"})
+    assert resp.status_code == 200
+    resp = await ac.get("/api/v1/users/profile", headers=headers)
+    assert resp.json()["first_name"] == "Changed"
+
+
+@pytest.mark.asyncio
+async def test_load_racing_an_invalidation_is_not_cached(db_session, unique_email: str):
+    user = await user_repository.create_if_email_free(db_session, obj_in={
+        "email": unique_email,
+        "password_hash": "x",
+        "first_name": "Race",
+        "last_name": "User",
+        "is_active": True,
+    })
+    user_id = str(user.id)
+
+    # A load that read the generation and epoch before the invalidation,
+    # and finishes after it
+    await user_cache.get(db_session, user_id)
+    epoch = user_cache._epoch
+    await user_cache.invalidate(user.id)
+    await user_cache.set(user, generation=None, epoch=epoch)
+    assert user_cache.local.get(user_id) is None
+
+    misses = user_cache.misses
+    await user_cache.get(db_session, user_id)
+    assert user_cache.misses == misses + 1
+
+
+@pytest.mark.asyncio
+async def test_published_invalidation_clears_local_entry():
+    await user_cache.start()
+    try:
+        for _ in range(50):
+            subscribers = dict(await redis_client.redis_client.pubsub_numsub(USER_INVALIDATION_CHANNEL))
+            if subscribers.get(USER_INVALIDATION_CHANNEL):
+                break
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(0.05)
+
+        # Another worker invalidates the user
+        user_cache.local.set("elsewhere", {"id": "elsewhere"})
+        await redis_client.publish(USER_INVALIDATION_CHANNEL, "elsewhere")
+        for _ in range(50):
+            if user_cache.local.get("elsewhere") is None:
+                break
+            await asyncio.sleep(0.02)
+        assert user_cache.local.get("elsewhere") is None
+    finally:
+        await user_cache.stop()